@@ -1,18 +1,43 @@
 import os
 import re
-import tempfile
-import fitz
+import uuid
+import pandas as pd
 import streamlit as st
 from datetime import datetime
+from contextlib import contextmanager, nullcontext
 from history_manager import (
-    get_customer_options,
+    get_customers,
+    search_customers,
+    prefetch_loan_index,
+    get_portfolio_inputs,
     load_customer_input,
     delete_customer_from_notion,
-    fetch_all_notion_customers,
     create_new_customer,
     update_existing_customer,
+    get_sync_status,
+    get_unsynced_customers,
+    retry_sync,
 )
 from ltv_map import region_map
+from region_resolver import resolve_region
+from ltv_engine import (
+    parse_comma_number,
+    parse_korean_number,
+    evaluate_sums,
+    LOAN_STATUSES,
+    calculate_fees,
+    build_memo,
+)
+from loan_table import (
+    PAGE_ID, DEFAULT_LIEN_RATIO, empty_loan_df, loan_df_from_rows, lien_loan_rows, normalize_loan_df,
+    reconcile_loan_df, loan_sums_df, loan_items,
+)
+from portfolio import build_portfolio_frames, compute_portfolio, rank_by_available, sensitivity_grid, sensitivity_table
+from extraction_cache import extract_pdf_cached
+from disk_store import disk_store
+from pdf_documents import pdf_documents
+from pdf_viewer import file_hash, get_page_count, pdf_to_image, pdf_thumbnail, prefetch_pages, cancel_prefetch, THUMB_ZOOM
+from perf_metrics import span, summary, begin_run, end_run, PROMETHEUS_PATH, EXPORT_FORMATS
 
 # ─────────────────────────────
 # 🏠 페이지 설정 (가장 먼저 실행)
@@ -23,24 +48,42 @@ st.set_page_config(
     layout="wide",
 )
 
-# ------------------------------
-# 🔹 함수 정의
-# ------------------------------
-def process_pdf(uploaded_file):
-    doc = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-    text = ""
-    for page in doc: text += page.get_text("text")
-    doc.close()
-    return text
+# 전체 실행 시간을 재고, 조각(fragment)만 다시 실행될 때와 구분할 수 있도록 표시해 둡니다.
+# 실행 중에 기록된 구간(PDF 분석, 렌더링, Notion 호출 등)은 perf_metrics 가 실행별 내역으로 묶습니다.
+perf_run = begin_run("전체 실행")
+st.session_state["in_full_run"] = True
+# 디버그 패널: 주소 뒤에 ?debug=1 을 붙이거나 LTV_DEBUG_PANEL=1 로 실행
+DEBUG_PANEL = st.query_params.get("debug") == "1" or os.environ.get("LTV_DEBUG_PANEL") == "1"
+RECENT_RUNS = 20
+
+def remember_run(run):
+    """이 세션의 최근 실행 내역을 보관합니다 (디버그 패널용)."""
+    if run is not None:
+        runs = st.session_state.setdefault("perf_runs", [])
+        runs.append(run)
+        del runs[:-RECENT_RUNS]
+
+@contextmanager
+def fragment_span(name):
+    """조각의 소요 시간을 기록합니다. 전체 실행 안에서 불린 경우("구간")와 조각만 다시 실행된 경우("조각")를 나눕니다."""
+    if st.session_state.get("in_full_run"):
+        with span(f"구간: {name}"):
+            yield
+        return
+    run = begin_run(f"조각: {name}")
+    try:
+        yield
+    finally:
+        remember_run(end_run(run))
+
+def rerun_section():
+    """조각 안에서 다시 그리기. 전체 실행 중에 불린 조각에서는 조각 단위 재실행이 허용되지 않으므로 전체를 다시 실행합니다."""
+    st.rerun(scope="app" if st.session_state.get("in_full_run") else "fragment")
 
 # ------------------------------
 # 유틸 함수
 # ------------------------------
 
-def parse_comma_number(text):
-    try: return int(re.sub(r"[^\d]", "", str(text)))
-    except: return 0
-
 # ✅ 콤마 + 만단위 절삭 함수 (100단위 절삭)
 
 def format_with_comma(key):
@@ -61,101 +104,6 @@ def format_area():
     clean = re.sub(r"[^\d.]", "", raw)
     st.session_state["extracted_area"] = f"{clean}㎡" if clean else ""
     
-def floor_to_unit(value, unit=100):
-    return value // unit * unit
-
-def pdf_to_image(pdf_path, page_num, zoom=2.0):
-    doc = fitz.open(pdf_path)
-    if page_num >= len(doc):
-        return None
-    page = doc.load_page(page_num)
-    mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat)
-    return pix.tobytes("png")
-
-def parse_korean_number(text: str) -> int:
-    txt = str(text).replace(",", "").strip()
-    total = 0
-    m = re.search(r"(\d+)\s*억", txt)
-    if m:
-        total += int(m.group(1)) * 10000
-    m = re.search(r"(\d+)\s*천만", txt)
-    if m:
-        total += int(m.group(1)) * 1000
-    m = re.search(r"(\d+)\s*만", txt)
-    if m:
-        total += int(m.group(1))
-    if total == 0:
-        try:
-            total = int(txt)
-        except:
-            total = 0
-    return total
-
-# ------------------------------
-# 🔹 텍스트 기반 추출 함수들
-# ------------------------------
-
-def extract_address(text):
-    m = re.search(r"\[집합건물\]\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    m = re.search(r"소재지\s*[:：]?\s*([^\n]+)", text)
-    if m:
-        return m.group(1).strip()
-    return ""
-
-def extract_area_floor(text):
-    m = re.findall(r"(\d+\.\d+)\s*㎡", text.replace('\n', ' '))
-    area = f"{m[-1]}㎡" if m else ""
-    floor = None
-    addr = extract_address(text)
-    f_match = re.findall(r"제(\d+)층", addr)
-    if f_match:
-        floor = int(f_match[-1])
-    return area, floor
-
-def extract_all_names_and_births(text):
-    start = text.find("주요 등기사항 요약")
-    if start == -1:
-        return []
-    summary = text[start:]
-    lines = [l.strip() for l in summary.splitlines() if l.strip()]
-    result = []
-    for i in range(len(lines)):
-        if re.match(r"[가-힣]+ \(공유자\)|[가-힣]+ \(소유자\)", lines[i]):
-            name = re.match(r"([가-힣]+)", lines[i]).group(1)
-            if i + 1 < len(lines):
-                birth_match = re.match(r"(\d{6})-", lines[i + 1])
-                if birth_match:
-                    birth = birth_match.group(1)
-                    result.append((name, birth))
-    return result
-
-# ------------------------------
-# 🔹 PDF 처리 함수
-# ------------------------------
-
-def process_pdf(uploaded_file):
-    doc = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-    text = ""
-    external_links = []
-
-    for page in doc:
-        text += page.get_text("text")
-        links = page.get_links()
-        for link in links:
-            if "uri" in link:
-                external_links.append(link["uri"])
-
-    doc.close()
-
-    address = extract_address(text)
-    area, floor = extract_area_floor(text)
-    co_owners = extract_all_names_and_births(text)
-
-    return text, external_links, address, area, floor, co_owners
-
 # ─────────────────────────────
 # 🔹 세션 초기화
 # ─────────────────────────────
@@ -163,6 +111,96 @@ def process_pdf(uploaded_file):
 for key in ["extracted_address", "extracted_area", "raw_price", "extracted_floor"]:
     if key not in st.session_state: st.session_state[key] = ""
 if "co_owners" not in st.session_state: st.session_state["co_owners"] = []
+if "prefetch_owner" not in st.session_state: st.session_state["prefetch_owner"] = uuid.uuid4().hex
+# 세션이 끝나거나 세션 상태가 초기화되면 이 세션만 보던 PDF 파일(디스크)과 열린 문서(메모리)를 정리합니다.
+if "disk_lease" not in st.session_state: st.session_state["disk_lease"] = disk_store.lease(st.session_state["prefetch_owner"])
+if "pdf_lease" not in st.session_state: st.session_state["pdf_lease"] = pdf_documents.lease(st.session_state["prefetch_owner"])
+
+def current_pdf_handle():
+    """업로드 때 열어 둔 공유 문서 핸들 (없으면 None)"""
+    pdf_hash = st.session_state.get("uploaded_pdf_hash")
+    return pdf_documents.get(pdf_hash) if pdf_hash else None
+
+def current_pdf_path():
+    """미리보기/다운로드용 PDF 경로. 저장소 상한으로 지워졌으면 업로드된 파일에서 다시 씁니다."""
+    pdf_hash = st.session_state.get("uploaded_pdf_hash")
+    if not pdf_hash:
+        return None
+    pdf_path = disk_store.get_pdf(pdf_hash)
+    if pdf_path is None:
+        handle = current_pdf_handle()
+        uploaded = st.session_state.get("pdf_uploader")
+        data = handle.data if handle is not None else uploaded.getvalue() if uploaded is not None else None
+        if data is not None:
+            pdf_path = disk_store.put_pdf(pdf_hash, data, owner=st.session_state["prefetch_owner"])
+    return pdf_path
+
+# ─────────────────────────────
+# 📄 PDF 미리보기 (조각)
+# ─────────────────────────────
+THUMBS_PER_ROW = 10
+# 백그라운드 작업자는 모든 세션이 함께 쓰므로, 한 세션이 미리 맡기는 썸네일은 처음 몇 줄로 제한합니다.
+# (나머지는 화면을 그린 뒤 칸을 채울 때 바로 그립니다)
+THUMB_PREFETCH_PAGES = 2 * THUMBS_PER_ROW
+
+def go_to_page(page):
+    st.session_state.page_index = page
+
+@st.fragment
+def pdf_preview():
+    with fragment_span("PDF 미리보기"):
+        pdf_path = current_pdf_path()
+        pdf_hash = st.session_state.get("uploaded_pdf_hash")
+        if pdf_path is None:
+            st.warning("PDF 미리보기 파일을 찾을 수 없습니다. 파일을 다시 업로드해 주세요.")
+            return
+        try:
+            total_pages = get_page_count(pdf_path, pdf_hash)
+            page_index = min(st.session_state.get("page_index", 0), total_pages - 1)
+
+            # 전체 페이지 썸네일 (저배율, 한 번 그리면 캐시). 누르면 그 페이지로 바로 이동합니다.
+            # 앞쪽 썸네일은 백그라운드에서 그리게 해 두고, 보이는 페이지를 먼저 그린 뒤 칸을 채웁니다.
+            prefetch_pages(pdf_path, range(min(total_pages, THUMB_PREFETCH_PAGES)), st.session_state["prefetch_owner"],
+                           zoom=THUMB_ZOOM, pdf_hash=pdf_hash)
+            with st.expander(f"🗂️ 전체 페이지 ({total_pages}쪽)", expanded=True):
+                slots = []
+                for row_start in range(0, total_pages, THUMBS_PER_ROW):
+                    for page, col in zip(range(row_start, total_pages), st.columns(THUMBS_PER_ROW)):
+                        with col:
+                            slots.append((page, st.empty()))
+                            st.button(f"{page + 1}", key=f"thumb_{page}", on_click=go_to_page, args=(page,), use_container_width=True,
+                                      type="primary" if page in (page_index, page_index + 1) else "secondary")
+
+            # 고배율 렌더링은 화면에 보이는 두 페이지만 합니다.
+            img1 = pdf_to_image(pdf_path, page_index, pdf_hash=pdf_hash)
+            img2 = pdf_to_image(pdf_path, page_index + 1, pdf_hash=pdf_hash) if page_index + 1 < total_pages else None
+
+            cols = st.columns(2)
+            with cols[0]:
+                if img1: st.image(img1, caption=f"{page_index + 1} 페이지")
+            with cols[1]:
+                if img2: st.image(img2, caption=f"{page_index + 2} 페이지")
+
+            # 보는 동안 다음 페이지 쌍을 고배율로 미리 그려 둡니다. 썸네일 작업 뒤에 줄을 서며,
+            # 그 전에 넘기면 pdf_to_image 가 대기 중인 작업을 취소하고 바로 그리므로 화면을 막지 않습니다.
+            prefetch_pages(pdf_path, [p for p in (page_index + 2, page_index + 3) if p < total_pages],
+                           st.session_state["prefetch_owner"], pdf_hash=pdf_hash)
+
+            col_prev, _, col_next = st.columns([1, 2, 1])
+            with col_prev:
+                if st.button("⬅️ 이전 페이지") and page_index > 0:
+                    st.session_state.page_index = max(page_index - 2, 0)
+                    rerun_section()
+            with col_next:
+                if st.button("➡️ 다음 페이지") and page_index + 2 < total_pages:
+                    st.session_state.page_index += 2
+                    rerun_section()
+
+            for page, slot in slots:
+                thumb = pdf_thumbnail(pdf_path, page, pdf_hash=pdf_hash)
+                if thumb: slot.image(thumb)
+        except Exception as e:
+            st.warning(f"PDF 미리보기 중 오류 발생: {e}")
 
 # ─────────────────────────────
 # 📎 PDF 업로드 및 처리
@@ -172,11 +210,27 @@ uploaded_file = st.file_uploader("📎 PDF 파일 업로드", type="pdf", key="p
 # [핵심 수정] 초기화가 방금 요청된 것이 아닐 경우에만 PDF 관련 로직을 실행합니다.
 if uploaded_file and not st.session_state.get("reset_requested", False):
     
-    # 새 파일이 업로드되었을 때만 PDF를 다시 처리합니다.
-    if "pdf_processed" not in st.session_state or st.session_state.get('uploaded_file_name') != uploaded_file.name:
+    # 파일 이름이 아니라 내용 해시로 같은 PDF인지 판단합니다.
+    # (업로드가 바뀌었을 때만 바이트를 꺼내 해시를 다시 계산하고, 같은 바이트를 아래 처리에서 그대로 씁니다)
+    pdf_bytes = None
+    if st.session_state.get("uploaded_file_id") != uploaded_file.file_id:
+        pdf_bytes = uploaded_file.getvalue()
+        st.session_state["uploaded_file_id"] = uploaded_file.file_id
+        st.session_state["incoming_pdf_hash"] = file_hash(pdf_bytes)
+    pdf_hash = st.session_state["incoming_pdf_hash"]
+
+    # 새 내용의 파일이 업로드되었을 때만 PDF를 다시 처리합니다.
+    if "pdf_processed" not in st.session_state or st.session_state.get("uploaded_pdf_hash") != pdf_hash:
         
-        # 1. PDF 분석
-        text, external_links, address, area, floor, co_owners = process_pdf(uploaded_file)
+        # 이전 PDF의 미리 렌더링 작업은 더 이상 필요 없으므로 취소합니다.
+        cancel_prefetch(st.session_state["prefetch_owner"])
+
+        # 1. PDF를 한 번만 열어 두고(이전 PDF 문서는 닫힘) 추출과 미리보기가 함께 씁니다.
+        #    같은 내용을 이전에 분석했다면 추출 결과는 캐시에서 바로 가져옵니다.
+        pdf_handle = pdf_documents.open(pdf_hash, pdf_bytes or uploaded_file.getvalue(), st.session_state["prefetch_owner"])
+        extracted = extract_pdf_cached(pdf_handle, pdf_hash)
+        address, area, floor = extracted["address"], extracted["area"], extracted["floor"]
+        co_owners = [tuple(owner) for owner in extracted["co_owners"]]
         
         # 2. 추출된 모든 정보를 세션 상태에 저장
         st.session_state["address_input"] = address
@@ -184,6 +238,14 @@ if uploaded_file and not st.session_state.get("reset_requested", False):
         st.session_state["area_input"] = area # 입력칸에도 바로 반영
         st.session_state["extracted_floor"] = floor
         st.session_state["co_owners"] = co_owners
+
+        # 주소로 방공제 지역을 자동 선택합니다 (판별할 수 없는 지역은 직접 고르도록 그대로 둡니다).
+        resolved = resolve_region(address)
+        if resolved:
+            st.session_state["region"] = resolved.region
+            st.session_state["region_auto"] = (resolved.region, resolved.rule)
+        else:
+            st.session_state.pop("region_auto", None)
         
         # 3. 공동소유자 정보를 가공하여 고객명 필드에 저장
         if co_owners:
@@ -194,13 +256,20 @@ if uploaded_file and not st.session_state.get("reset_requested", False):
             # 소유자 정보가 없을 경우, 고객명 필드를 비워줍니다.
             st.session_state["customer_name"] = ""
 
+        # 을구/요약에 남아 있는 근저당권으로 대출 표를 채웁니다.
+        # 직접 입력한 항목이 있으면 덮어쓰지 않고, 이전 PDF에서 채운 그대로인 표만 새 PDF 기준으로 바꿉니다.
+        lien_rows = lien_loan_rows(extracted.get("liens", []))
+        current_items = loan_items(st.session_state.get("loan_df", empty_loan_df()))
+        if lien_rows and (not current_items or current_items == st.session_state.get("loan_prefill_items")):
+            st.session_state["loan_df"] = loan_df_from_rows(lien_rows)
+            st.session_state["loan_prefill_items"] = loan_items(st.session_state["loan_df"])
+            st.session_state.pop("loan_editor_base", None)   # 아래 대출 표가 새 원본으로 편집기를 다시 만듭니다.
+
         st.success(f"📍 PDF에서 주소 추출: {address}")
 
-        # 4. 미리보기용 임시 파일 생성
-        uploaded_file.seek(0)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(uploaded_file.getbuffer())
-            st.session_state["uploaded_pdf_path"] = tmp_file.name
+        # 4. 미리보기용 파일 저장 (크기/기간 상한이 있는 디스크 저장소, 이전 PDF는 다른 세션이 쓰지 않으면 삭제)
+        disk_store.put_pdf(pdf_hash, pdf_handle.data, owner=st.session_state["prefetch_owner"])
+        st.session_state["uploaded_pdf_hash"] = pdf_hash
         
         # 5. 처리 완료 상태 저장
         st.session_state['uploaded_file_name'] = uploaded_file.name
@@ -208,47 +277,47 @@ if uploaded_file and not st.session_state.get("reset_requested", False):
         st.session_state.pdf_processed = True
         st.rerun()
 
-    # --- PDF 미리보기 UI ---
-    if "uploaded_pdf_path" in st.session_state:
-        pdf_path = st.session_state["uploaded_pdf_path"]
-        try:
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            doc.close()
-            page_index = st.session_state.get("page_index", 0)
-
-            img1 = pdf_to_image(pdf_path, page_index)
-            img2 = pdf_to_image(pdf_path, page_index + 1) if page_index + 1 < total_pages else None
-
-            cols = st.columns(2)
-            with cols[0]:
-                if img1: st.image(img1, caption=f"{page_index + 1} 페이지")
-            with cols[1]:
-                if img2: st.image(img2, caption=f"{page_index + 2} 페이지")
-            
-            col_prev, _, col_next = st.columns([1, 2, 1])
-            with col_prev:
-                if st.button("⬅️ 이전 페이지") and page_index >= 2:
-                    st.session_state.page_index -= 2
-                    st.rerun()
-            with col_next:
-                if st.button("➡️ 다음 페이지") and page_index + 2 < total_pages:
-                    st.session_state.page_index += 2
-                    st.rerun()
-        except Exception as e:
-            st.warning(f"PDF 미리보기 중 오류 발생: {e}")
+    # --- PDF 미리보기 UI (페이지를 넘길 때는 이 부분만 다시 그립니다) ---
+    if "uploaded_pdf_hash" in st.session_state:
+        pdf_preview()
 
 # ─────────────────────────────
 # 🗂️ 고객 이력 관리 (최종 버전)
 # ─────────────────────────────
 
-if "notion_customers" not in st.session_state:
-    fetch_all_notion_customers()
+CUSTOMER_PAGE_SIZE = 20
+
+def move_customer_page(delta):
+    st.session_state["customer_search_page"] = max(0, st.session_state.get("customer_search_page", 0) + delta)
+
+def describe_customer(name):
+    if not name: return ""
+    address = get_customers().get(name, {}).get("address_input", "")
+    return f"{name} · {address}" if address else name
+
+# 1. 검색어로 고객을 찾고, 일치하는 고객만 한 페이지씩 드롭다운에 보여줍니다.
+search_col, page_col = st.columns([3, 1])
+with search_col:
+    customer_query = st.text_input("고객 검색", key="customer_search", placeholder="🔍 이름 · 생년월일 · 주소 · 초성(예: ㅎㄱㄷ)으로 검색", label_visibility="collapsed")
+if st.session_state.get("customer_search_last") != customer_query:
+    st.session_state["customer_search_last"] = customer_query
+    st.session_state["customer_search_page"] = 0
+search_page = st.session_state.get("customer_search_page", 0)
+matches, match_total = search_customers(customer_query, search_page * CUSTOMER_PAGE_SIZE, CUSTOMER_PAGE_SIZE)
+with page_col:
+    prev_col, next_col = st.columns(2)
+    with prev_col:
+        st.button("◀", key="customer_page_prev", disabled=search_page == 0, on_click=move_customer_page, args=(-1,), use_container_width=True)
+    with next_col:
+        st.button("▶", key="customer_page_next", disabled=(search_page + 1) * CUSTOMER_PAGE_SIZE >= match_total, on_click=move_customer_page, args=(1,), use_container_width=True)
+    if match_total:
+        st.caption(f"{match_total}명 중 {search_page * CUSTOMER_PAGE_SIZE + 1}–{min(match_total, (search_page + 1) * CUSTOMER_PAGE_SIZE)}")
 
-# 1. 고객을 선택하는 드롭다운 메뉴
 selected_customer = st.selectbox(
-    "고객 선택", [""] + get_customer_options(), key="load_customer_select", label_visibility="collapsed"
+    "고객 선택", [""] + matches, key="load_customer_select", format_func=describe_customer, label_visibility="collapsed"
 )
+# 고객을 고르는 동안 대출 항목을 미리 받아 두어 "불러오기"가 바로 끝나도록 합니다.
+prefetch_loan_index()
 cols = st.columns(3)
 with cols[0]:
     # 2. 고객이 선택되었을 때만 "불러오기" 버튼이 보임
@@ -278,6 +347,9 @@ col1, col2 = st.columns(2)
 with col1:
     # 1. 사용자가 드롭다운에서 지역을 선택하면 페이지가 새로고침됩니다.
     region = st.selectbox("방공제 지역", [""] + list(region_map.keys()), key="region")
+    auto_region, auto_rule = st.session_state.get("region_auto") or (None, None)
+    if auto_region and auto_region == region:
+        st.caption(f"📍 주소로 자동 선택 ({auto_rule})")
     
 with col2:
     # 2. 선택된 지역에 맞는 금액을 찾습니다.
@@ -328,8 +400,11 @@ with col2:
     if st.button("하우스머치 시세조회"):
         st.components.v1.html("<script>window.open('https://www.howsmuch.com','_blank')</script>", height=0)
 with col3:
-    if "uploaded_pdf_path" in st.session_state:
-        with open(st.session_state["uploaded_pdf_path"], "rb") as f:
+    pdf_handle = current_pdf_handle()
+    pdf_path = current_pdf_path() if pdf_handle is None else None
+    if pdf_handle is not None or pdf_path:
+        # 열린 문서가 있으면 그 바이트를 그대로 내려주고, 없을 때만 저장소의 파일을 읽습니다.
+        with (open(pdf_path, "rb") if pdf_handle is None else nullcontext(pdf_handle.data)) as f:
             st.download_button(
                 label="🌐 브라우저 새 탭에서 PDF 열기",
                 data=f,
@@ -352,229 +427,142 @@ ltv_selected = sorted(list(dict.fromkeys(ltv_selected)), reverse=True)
 st.session_state["ltv_selected"] = ltv_selected
 
 # ─────────────────────────────
-# 대출 항목 입력 (최종 수정본)
-# ─────────────────────────────
-st.markdown("---")
-st.subheader("대출 항목 입력")
-
-def bidirectional_loan_calculator(maxamt_key, ratio_key, principal_key):
-    """하나의 대출 항목에 대한 양방향 자동 계산을 수행하는 콜백 함수"""
-    try:
-        # 현재 세션 상태의 값들을 가져옴
-        max_amt_str = st.session_state.get(maxamt_key, "")
-        ratio_str = st.session_state.get(ratio_key, "")
-        principal_str = st.session_state.get(principal_key, "")
-
-        # 마지막으로 포커스가 있었던 위젯(방금 사용자가 수정한 위젯)을 확인
-        last_active_widget = st.session_state.get("last_active_loan_widget")
-
-        # 숫자 값으로 변환
-        max_val = parse_comma_number(max_amt_str)
-        rat_val = parse_comma_number(ratio_str)
-        pri_val = parse_comma_number(principal_str)
-        
-        if rat_val > 0:
-            # 사용자가 '채권최고액' 또는 '비율'을 수정했고, '원금'이 비어있거나 자동계산 대상일 때
-            if last_active_widget in [maxamt_key, ratio_key]:
-                calculated_pri = int(max_val * 100 / rat_val)
-                st.session_state[principal_key] = f"{calculated_pri:,}"
-            # 사용자가 '원금'을 수정했을 때
-            elif last_active_widget == principal_key:
-                calculated_max = int(pri_val * rat_val / 100)
-                st.session_state[maxamt_key] = f"{calculated_max:,}"
-
-    except (ValueError, ZeroDivisionError):
-        pass
-
-def set_active_widget(key):
-    """어떤 위젯이 마지막으로 활성화되었는지 기록하는 헬퍼 함수"""
-    st.session_state["last_active_loan_widget"] = key
-
-
-st.number_input(
-    "대출 항목 개수",
-    min_value=1,
-    key="num_loan_items"
-)
-
-items = []
-for i in range(st.session_state.get("num_loan_items", 1)):
-    lender_key, maxamt_key, ratio_key, principal_key, status_key = f"lender_{i}", f"maxamt_{i}", f"ratio_{i}", f"principal_{i}", f"status_{i}"
-
-    # --- [최종 수정] 엑셀처럼 작동하는 양방향 계산 로직 ---
-
-    # 1. '직전 실행' 때의 값을 불러옵니다.
-    prev_max_val = st.session_state.get(f"prev_max_{i}", 0)
-    prev_pri_val = st.session_state.get(f"prev_pri_{i}", 0)
-    prev_rat_val = st.session_state.get(f"prev_rat_{i}", 0)
-
-    # 2. 현재 입력된 값을 숫자로 변환합니다.
-    max_val = parse_comma_number(st.session_state.get(maxamt_key, ""))
-    pri_val = parse_comma_number(st.session_state.get(principal_key, ""))
-    rat_val = parse_comma_number(st.session_state.get(ratio_key, ""))
-
-    # 3. 계산 로직 실행: 마지막으로 수정한 값을 기준으로 다른 값을 계산합니다.
-    try:
-        # 규칙 1: 원금이 수정되었다면 (최우선), 채권최고액을 재계산
-        if pri_val != prev_pri_val:
-            if rat_val > 0:
-                new_max = f"{int(pri_val * rat_val / 100):,}"
-                st.session_state[maxamt_key] = new_max
-        # 규칙 2: 원금은 그대로인데, 채권최고액이나 비율이 수정되었다면, 원금을 재계산
-        elif max_val != prev_max_val or rat_val != prev_rat_val:
-            if max_val > 0 and rat_val > 0:
-                new_pri = f"{int(max_val * 100 / rat_val):,}"
-                st.session_state[principal_key] = new_pri
-    except (ValueError, ZeroDivisionError):
-        pass
-
-    # 4. 위젯을 그립니다.
-    cols = st.columns(5)
-    with cols[0]:
-        st.text_input(f"설정자 {i+1}", key=lender_key, label_visibility="collapsed", placeholder=f"{i+1}. 설정자")
-    with cols[1]:
-        st.text_input(f"채권최고액 {i+1}", key=maxamt_key, on_change=format_with_comma, args=(maxamt_key,), label_visibility="collapsed", placeholder="채권최고액 (만)")
-    with cols[2]:
-        st.text_input(f"설정비율 {i+1}", key=ratio_key, label_visibility="collapsed", placeholder="설정비율 (%)")
-    with cols[3]:
-        st.text_input(f"원금 {i+1}", key=principal_key, on_change=format_with_comma, args=(principal_key,), label_visibility="collapsed", placeholder="원금 (만)")
-    with cols[4]:
-        st.selectbox(f"진행구분 {i+1}", ["유지", "대환", "선말소"], key=status_key, index=0, label_visibility="collapsed")
-
-    # 5. 다음 실행을 위해 현재 값을 '직전 값'으로 저장합니다.
-    st.session_state[f"prev_max_{i}"] = parse_comma_number(st.session_state.get(maxamt_key))
-    st.session_state[f"prev_pri_{i}"] = parse_comma_number(st.session_state.get(principal_key))
-    st.session_state[f"prev_rat_{i}"] = parse_comma_number(st.session_state.get(ratio_key))
-    
-    items.append({
-        "설정자": st.session_state.get(lender_key, ""),
-        "채권최고액": st.session_state.get(maxamt_key, ""),
-        "설정비율": st.session_state.get(ratio_key, ""),
-        "원금": st.session_state.get(principal_key, ""),
-        "진행구분": st.session_state.get(status_key, "유지")
-    })
-
-# ─────────────────────────────
-# [요청 3] 수수료 계산부 위치 이동
+# 대출 항목 입력 ~ 결과 메모 (조각)
 # ─────────────────────────────
+# 대출 표나 수수료를 고치면 이 조각만 다시 실행되어 표, 메모, 시나리오만 새로 그립니다.
+# 주소/시세/LTV 같은 위쪽 입력이 바뀌면 전체가 다시 실행되면서 새 인자로 이 조각을 부릅니다.
+# loan_df: 직전 실행 기준의 대출 표 (저장/불러오기도 이 표를 씁니다)
+# loan_editor_base: 편집기에 넘긴 원본. 자동 계산으로 값을 바꿀 때만 새 원본으로 바꾸고 편집기 버전을 올립니다.
+if "loan_df" not in st.session_state:
+    st.session_state["loan_df"] = empty_loan_df()
+if "loan_editor_base" not in st.session_state:
+    st.session_state["loan_editor_base"] = st.session_state["loan_df"]
+    st.session_state["loan_editor_version"] = st.session_state.get("loan_editor_version", 0) + 1
+
+def reset_loan_editor(df):
+    st.session_state["loan_df"] = df
+    st.session_state["loan_editor_base"] = df
+    st.session_state["loan_editor_version"] = st.session_state.get("loan_editor_version", 0) + 1
+
+def resize_loan_table():
+    """대출 항목 개수에 맞춰 빈 행을 붙이거나 뒤쪽 행을 잘라냅니다."""
+    df = st.session_state["loan_df"]
+    count = int(st.session_state.get("num_loan_items") or 1)
+    if count > len(df):
+        extra = empty_loan_df(count - len(df))
+        extra.index = range(len(df), count)
+        df = normalize_loan_df(pd.concat([df, extra]))
+    reset_loan_editor(df.iloc[:count])
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def cached_sensitivity_grid(total_value, deduction, senior_principal, maintain_maxamt, sub_principal, shocks, ratios):
+    return sensitivity_grid(total_value, deduction, senior_principal, maintain_maxamt, sub_principal, shocks, ratios)
+
+@st.fragment
+def loan_and_result_section(deduction, floor_num, ltv_selected):
+    with fragment_span("대출/메모"):
+        st.markdown("---")
+        st.subheader("대출 항목 입력")
+
+        if st.session_state.get("loan_prefill_items") and loan_items(st.session_state["loan_df"]) == st.session_state["loan_prefill_items"]:
+            st.caption(f"📑 등기부 을구에서 남아 있는 근저당 {len(st.session_state['loan_prefill_items'])}건을 불러왔습니다. "
+                       f"원금은 설정비율 {DEFAULT_LIEN_RATIO}% 기준 추정값이니 확인해 주세요.")
+        st.session_state["num_loan_items"] = len(st.session_state["loan_df"])
+        st.number_input(
+            "대출 항목 개수",
+            min_value=1,
+            key="num_loan_items",
+            on_change=resize_loan_table,
+        )
+
+        edited = st.data_editor(
+            st.session_state["loan_editor_base"],
+            key=f"loan_editor_{st.session_state['loan_editor_version']}",
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "설정자": st.column_config.TextColumn("설정자"),
+                "채권최고액": st.column_config.NumberColumn("채권최고액 (만)", min_value=0, step=1, format="localized"),
+                "설정비율": st.column_config.NumberColumn("설정비율 (%)", min_value=0, step=1),
+                "원금": st.column_config.NumberColumn("원금 (만)", min_value=0, step=1, format="localized"),
+                "진행구분": st.column_config.SelectboxColumn("진행구분", options=list(LOAN_STATUSES), required=True),
+                PAGE_ID: None,
+            },
+        )
+
+        # 엑셀처럼 작동하는 양방향 계산: 직전 실행의 표와 비교해 바뀐 칸을 기준으로 열 단위로 다시 계산합니다.
+        loan_df, recalculated = reconcile_loan_df(normalize_loan_df(edited), st.session_state["loan_df"])
+        if recalculated:
+            reset_loan_editor(loan_df)
+            rerun_section()
+        st.session_state["loan_df"] = loan_df
+
+        # ─────────────────────────────
+        # [요청 3] 수수료 계산부 위치 이동
+        # ─────────────────────────────
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.text_input("컨설팅 금액 (만원)", key="consult_amt", on_change=format_with_comma, args=("consult_amt",))
+            consult_amount = parse_comma_number(st.session_state.get("consult_amt", "0"))
+        with col2:
+            consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f", key="consult_rate")
+        with col3:
+            st.text_input("브릿지 금액 (만원)", key="bridge_amt", on_change=format_with_comma, args=("bridge_amt",))
+            bridge_amount = parse_comma_number(st.session_state.get("bridge_amt", "0"))
+        with col4:
+            bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f", key="bridge_rate")
+
+        fees = calculate_fees(consult_amount, consult_rate, bridge_amount, bridge_rate)
+
+        # ─────────────────────────────
+        # 📋 LTV 계산/결과 메모 생성/출력 (기존 복잡한 로직 유지)
+        # ─────────────────────────────
+        st.subheader("📋 결과 내용")
+
+        raw_price_input = st.session_state.get("raw_price_input", "")
+        total_value = parse_korean_number(raw_price_input)
+        with span("LTV 계산/메모"):
+            result = evaluate_sums(total_value, deduction, loan_sums_df(loan_df), ltv_selected, loan_items(loan_df))
+            sum_dh, sum_sm, sum_maintain, sum_sub_principal = result.sums
+
+            # 결과 메모 자동생성
+            text_to_copy = build_memo(
+                st.session_state.get("customer_name", ""),
+                st.session_state.get("address_input", ""),
+                st.session_state.get("area_input", ""),
+                raw_price_input,
+                floor_num,
+                deduction,
+                result,
+                ltv_selected,
+                fees,
+            )
 
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.text_input("컨설팅 금액 (만원)", key="consult_amt", on_change=format_with_comma, args=("consult_amt",))
-    consult_amount = parse_comma_number(st.session_state.get("consult_amt", "0"))
-with col2:
-    consult_rate = st.number_input("컨설팅 수수료율 (%)", min_value=0.0, value=1.5, step=0.1, format="%.1f", key="consult_rate")
-with col3:
-    st.text_input("브릿지 금액 (만원)", key="bridge_amt", on_change=format_with_comma, args=("bridge_amt",))
-    bridge_amount = parse_comma_number(st.session_state.get("bridge_amt", "0"))
-with col4:
-    bridge_rate = st.number_input("브릿지 수수료율 (%)", min_value=0.0, value=0.7, step=0.1, format="%.1f", key="bridge_rate")
-
-consult_fee = int(consult_amount * consult_rate / 100)
-bridge_fee = int(bridge_amount * bridge_rate / 100)
-total_fee = consult_fee + bridge_fee
-
-# ─────────────────────────────
-# 📋 LTV 계산/결과 메모 생성/출력 (기존 복잡한 로직 유지)
-# ─────────────────────────────
-st.subheader("📋 결과 내용")
-
-rows = st.session_state.get("num_loan_items", 0)
-try:
-    rows = int(rows)
-except:
-    rows = 0
-
-raw_price_input = st.session_state.get("raw_price_input", "")
-total_value = parse_korean_number(raw_price_input)
-limit_senior_dict, limit_sub_dict, valid_items = {}, {}, []
-sum_dh = sum_sm = sum_maintain = sum_sub_principal = 0
-
-if rows == 0:
-    for ltv in ltv_selected:
-        limit = int(total_value * (ltv / 100) - deduction)
-        limit = (limit // 10) * 10
-        limit_senior_dict[ltv] = (limit, limit)
-else:
-    sum_dh = sum(
-        int(re.sub(r"[^\d]", "", str(item.get("원금", "0"))) or 0)
-        for item in items if item.get("진행구분") == "대환"
-    )
-    sum_sm = sum(
-        int(re.sub(r"[^\d]", "", str(item.get("원금", "0"))) or 0)
-        for item in items if item.get("진행구분") == "선말소"
-    )
-    sum_maintain = sum(
-        int(re.sub(r"[^\d]", "", str(item.get("채권최고액", "0"))) or 0)
-        for item in items if item.get("진행구분") == "유지"
-    )
-    sum_sub_principal = sum(
-        int(re.sub(r"[^\d]", "", str(item.get("원금", "0"))) or 0)
-        for item in items if item.get("진행구분") not in ["유지"]
-    )
-    valid_items = [item for item in items if any([
-        item.get("설정자", "").strip(),
-        re.sub(r"[^\d]", "", str(item.get("채권최고액", "") or "0")) != "0",
-        re.sub(r"[^\d]", "", str(item.get("원금", "") or "0")) != "0"
-    ])]
-
-    def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
-        if is_senior:
-            limit = int(total_value * (ltv / 100) - deduction)
-            available = int(limit - principal_sum)
-        else:
-            limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
-            available = int(limit - principal_sum)
-        limit = (limit // 10) * 10
-        available = (available // 10) * 10
-        return limit, available
-        
-    for ltv in ltv_selected:
-        if sum_maintain > 0:
-            limit_sub_dict[ltv] = calculate_ltv(total_value, deduction, sum_sub_principal, sum_maintain, ltv, is_senior=False)
-        else:
-            limit_senior_dict[ltv] = calculate_ltv(total_value, deduction, sum_dh + sum_sm, 0, ltv, is_senior=True)
-
-# --- [수정된 결과 메모 생성 코드] ---
-# 결과 메모 자동생성
-customer_name = st.session_state.get("customer_name", "")
-address_input = st.session_state.get("address_input", "")
-area_input = st.session_state.get("area_input", "")
-type_of_price = "하안가" if floor_num and floor_num <= 2 else "일반가"
-clean_price = parse_korean_number(raw_price_input)
-formatted_price = "{:,}".format(clean_price) if clean_price else raw_price_input
-text_to_copy = f"고객명 : {customer_name}\n주소 : {address_input}\n"
-text_to_copy += f"{type_of_price} | KB시세: {formatted_price} | 전용면적 : {area_input} | 방공제 금액 : {deduction:,}만\n"
-if valid_items:
-    text_to_copy += "\n[대출 항목]\n"
-    for item in valid_items:
-        raw_max = re.sub(r"[^\d]", "", str(item.get("채권최고액", "0")))
-        max_amt = int(raw_max) if raw_max else 0
-        raw_principal = re.sub(r"[^\d]", "", str(item.get("원금", "0")))
-        principal_amt = int(raw_principal) if raw_principal else 0
-        text_to_copy += f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 원금: {principal_amt:,} | {item.get('진행구분', '')}\n"
-
-for ltv in ltv_selected:
-    if ltv in limit_senior_dict:
-        limit, avail = limit_senior_dict[ltv]
-        text_to_copy += f"\n[선순위 LTV {ltv}%] 한도: {limit:,}만 | 가용: {avail:,}만"
-    if ltv in limit_sub_dict:
-        limit, avail = limit_sub_dict[ltv]
-        text_to_copy += f"\n[후순위 LTV {ltv}%] 한도: {limit:,}만 | 가용: {avail:,}만"
-
-text_to_copy += "\n[진행구분별 원금 합계]\n"
-if sum_dh > 0: text_to_copy += f"대환: {sum_dh:,}만\n"
-if sum_sm > 0: text_to_copy += f"선말소: {sum_sm:,}만\n"
-
-# [수정] 수수료 정보를 결과 메모 하단에 상세하게 추가합니다.
-text_to_copy += f"""
-[수수료 정보]
-컨설팅: {consult_amount:,}만 (수수료: {consult_fee:,}만)
-브릿지: {bridge_amount:,}만 (수수료: {bridge_fee:,}만)
-총 합계: {total_fee:,}만
-"""
-
-st.text_area("복사할 내용", text_to_copy, height=400, key="text_to_copy")
+        st.text_area("복사할 내용", text_to_copy, height=400, key="text_to_copy")
+
+        # ─────────────────────────────
+        # 📉 시세 변동 × LTV 시나리오
+        # ─────────────────────────────
+        with st.expander("📉 시세 변동 × LTV 시나리오"):
+            sc1, sc2 = st.columns(2)
+            with sc1:
+                shock_range = st.slider("시세 변동 (%)", -50, 30, (-20, 10), step=5, key="scenario_shock_range")
+            with sc2:
+                ratio_range = st.slider("LTV 범위 (%)", 30, 100, (40, 90), step=5, key="scenario_ratio_range")
+            shocks = tuple(range(shock_range[0], shock_range[1] + 1, 5))
+            ratios = tuple(range(ratio_range[0], ratio_range[1] + 1, 5))
+            # 입력값이 같으면 캐시된 격자를 그대로 쓰므로, 아래 보기 옵션을 바꿔도 다시 계산하지 않습니다.
+            grid = cached_sensitivity_grid(total_value, deduction, sum_dh + sum_sm, sum_maintain, sum_sub_principal, shocks, ratios)
+            sc3, sc4 = st.columns(2)
+            with sc3:
+                scenario_path = st.radio("구분", ["선순위", "후순위"], index=1 if sum_maintain > 0 else 0, horizontal=True, key="scenario_path")
+            with sc4:
+                scenario_metric = st.radio("지표", ["가용", "한도"], horizontal=True, key="scenario_metric")
+            st.dataframe(sensitivity_table(grid, scenario_path, scenario_metric), use_container_width=True)
+
+loan_and_result_section(deduction, floor_num, ltv_selected)
 
 # ─────────────────────────────
 # 💾 저장 / 수정 버튼
@@ -589,6 +577,85 @@ with col2:
     if st.button("🔄 기존 고객 정보 수정", use_container_width=True, type="primary"):
         update_existing_customer()
 
+# 저장 요청은 백그라운드에서 Notion에 반영되므로, 반영 상태를 몇 초마다 다시 확인합니다.
+SYNC_STATUS_REFRESH = 5
+
+@st.fragment(run_every=SYNC_STATUS_REFRESH)
+def sync_status_section():
+    customer_name = st.session_state.get("customer_name", "").strip()
+    if customer_name:
+        status = get_sync_status(customer_name)
+        if status["failed"]:
+            st.error(f"❌ '{customer_name}' Notion 반영 실패: {status['last_error']}")
+            st.button("🔁 다시 시도", key="sync_retry", on_click=retry_sync, args=(customer_name,))
+        elif status["pending"]:
+            note = f" (재시도 중: {status['last_error']})" if status["last_error"] else ""
+            st.info(f"⏳ '{customer_name}' Notion 반영 대기 중 {status['pending']}건{note}")
+        elif status["synced_at"]:
+            st.caption(f"✅ Notion 반영 완료 ({datetime.fromtimestamp(status['synced_at']).strftime('%m-%d %H:%M:%S')})")
+
+    unsynced = get_unsynced_customers()
+    if unsynced:
+        with st.expander(f"📮 Notion 반영 대기/실패 고객 {len(unsynced)}명"):
+            st.dataframe(
+                pd.DataFrame(unsynced, columns=["고객명", "대기", "실패", "마지막 오류"]),
+                use_container_width=True, hide_index=True,
+            )
+
+sync_status_section()
+
+
+# ─────────────────────────────
+# 📊 전체 고객 가용 순위
+# ─────────────────────────────
+
+@st.fragment
+def portfolio_section(ltv_selected):
+    with st.expander("📊 전체 고객 가용 순위"):
+        if st.toggle("저장된 전체 고객으로 계산", key="portfolio_enabled"):
+            portfolio_ratios = st.multiselect("LTV 비율 (%)", list(range(40, 95, 5)), default=ltv_selected or [80], key="portfolio_ratios")
+            if portfolio_ratios:
+                rank_ltv = st.selectbox("순위 기준 LTV (%)", sorted(portfolio_ratios, reverse=True), key="portfolio_rank_ltv")
+                try:
+                    portfolio_customers, portfolio_loans = get_portfolio_inputs()
+                    cust_df, portfolio_loan_df = build_portfolio_frames(portfolio_customers, portfolio_loans)
+                    portfolio_result = compute_portfolio(cust_df, portfolio_loan_df, portfolio_ratios)
+                    st.caption(f"고객 {len(cust_df):,}명 × LTV {len(portfolio_ratios)}개")
+                    st.dataframe(rank_by_available(portfolio_result, ltv=rank_ltv, top=100).drop(columns=["page_id"]), use_container_width=True, hide_index=True)
+                except Exception as e:
+                    st.warning(f"❗ 전체 고객 계산 실패: {e}")
+
+portfolio_section(ltv_selected)
+
+# ─────────────────────────────
+# ⏱️ 실행 시간 (전체 실행 vs 조각 실행)
+# ─────────────────────────────
+remember_run(end_run(perf_run))
+st.session_state["in_full_run"] = False
+
+if DEBUG_PANEL:
+    with st.expander("⏱️ 실행 시간 (디버그)", expanded=True):
+        runs = st.session_state.get("perf_runs", [])
+        if runs:
+            last = runs[-1]
+            st.caption(f"직전 실행: {last['name']} {last['total_ms']:,.1f}ms")
+            st.dataframe(pd.DataFrame({"ms": last["spans"]}), use_container_width=True)
+            st.caption("이 세션의 최근 실행")
+            st.dataframe(pd.DataFrame([
+                {"실행": run["name"], "시각": datetime.fromtimestamp(run["at"]).strftime("%H:%M:%S"), "ms": run["total_ms"],
+                 "가장 긴 구간": next(iter(run["spans"]), "")}
+                for run in reversed(runs)
+            ]), use_container_width=True, hide_index=True)
+        timings = summary()
+        if timings:
+            st.caption("구간별 누적 통계 (프로세스 전체, 최근 200건). 조각 실행은 해당 부분만 다시 그릴 때의 시간입니다.")
+            st.dataframe(pd.DataFrame.from_dict(timings, orient="index"), use_container_width=True)
+        st.caption("디스크 저장소 (업로드 PDF / 렌더 이미지)")
+        st.dataframe(pd.DataFrame([disk_store.summary()]), use_container_width=True, hide_index=True)
+        st.caption("열린 PDF 문서 (메모리)")
+        st.dataframe(pd.DataFrame([pdf_documents.summary()]), use_container_width=True, hide_index=True)
+        if "prometheus" in EXPORT_FORMATS:
+            st.caption(f"Prometheus 내보내기: {PROMETHEUS_PATH}")
 
 # --- 👇👇👇 이 부분을 추가하세요. 👇👇👇 ---
 st.markdown(
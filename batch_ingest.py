@@ -0,0 +1,126 @@
+"""등기부등본 PDF 일괄 추출 도구
+
+폴더 안의 PDF에서 주소, 전용면적, 층, 공동소유자, 남아 있는 근저당권을 추출하고 주소로 방공제 지역을 판별해 파일별로 한 줄씩 기록합니다.
+
+    python batch_ingest.py ./pdfs -o result.jsonl
+    python batch_ingest.py ./pdfs -o result.csv --workers 8 --recursive
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from registry_parser import process_pdf
+from region_resolver import region_resolver
+
+FIELDS = ["file", "address", "area", "floor", "region", "deduction", "co_owners", "liens", "seconds", "error"]
+
+# ------------------------------
+# 🔹 파일 하나 처리 (워커 프로세스에서 실행)
+# ------------------------------
+def empty_row(path, error=""):
+    """추출 전(또는 실패한) 파일의 기본 결과 행. FIELDS 의 모든 열을 채웁니다."""
+    return {"file": path, "address": "", "area": "", "floor": None, "region": "", "deduction": None,
+            "co_owners": [], "liens": [], "seconds": None, "error": error}
+
+def extract_one(path):
+    started = time.perf_counter()
+    row = empty_row(path)
+    try:
+        with open(path, "rb") as f:
+            _, _, address, area, floor, co_owners, liens = process_pdf(f)
+        row.update(address=address, area=area, floor=floor, co_owners=[f"{name} {birth}" for name, birth in co_owners],
+                   liens=[f"{lien.lender} {lien.max_amount:,}만" for lien in liens])
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - started, 4)
+    return row
+
+# ------------------------------
+# 🔹 결과 기록
+# ------------------------------
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow({**row, "co_owners": ", ".join(row["co_owners"]), "liens": ", ".join(row["liens"])})
+        self.stream.flush()
+
+
+def find_pdfs(folder, recursive=False):
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(folder) for name in names]
+    else:
+        paths = [os.path.join(folder, name) for name in os.listdir(folder)]
+    return sorted(p for p in paths if p.lower().endswith(".pdf") and os.path.isfile(p))
+
+# ------------------------------
+# 🔹 실행
+# ------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="등기부등본 PDF 일괄 추출")
+    parser.add_argument("folder", help="PDF가 들어 있는 폴더")
+    parser.add_argument("-o", "--output", help="결과 파일 (생략 시 표준 출력)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="출력 형식 (생략 시 출력 파일 확장자로 판단)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="동시에 처리할 프로세스 수")
+    parser.add_argument("-r", "--recursive", action="store_true", help="하위 폴더까지 검색")
+    args = parser.parse_args(argv)
+
+    paths = find_pdfs(args.folder, args.recursive)
+    if not paths:
+        print(f"PDF 파일이 없습니다: {args.folder}", file=sys.stderr)
+        return 1
+
+    fmt = args.format or ("csv" if args.output and args.output.lower().endswith(".csv") else "jsonl")
+    # 엑셀에서 한글이 깨지지 않도록 CSV는 BOM을 붙여 저장합니다.
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    stream = open(args.output, "w", encoding=encoding, newline="") if args.output else sys.stdout
+    writer = CsvWriter(stream) if fmt == "csv" else JsonlWriter(stream)
+
+    started = time.perf_counter()
+    failures = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {pool.submit(extract_one, path): path for path in paths}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    # 워커 프로세스 자체가 죽은 경우에도 나머지 파일은 계속 처리합니다.
+                    row = empty_row(futures[future], f"{type(e).__name__}: {e}")
+                # 방공제 지역은 주소만으로 마이크로초 단위에 판별되므로 메인 프로세스에서 한 번에 처리합니다.
+                resolved = region_resolver.resolve(row["address"])
+                if resolved:
+                    row.update(region=resolved.region, deduction=resolved.deduction)
+                writer.write(row)
+                if row["error"]:
+                    failures += 1
+                    print(f"[{done}/{len(paths)}] ❌ {row['file']} - {row['error']}", file=sys.stderr)
+                else:
+                    print(f"[{done}/{len(paths)}] ✅ {row['file']} ({row['seconds']:.2f}s)", file=sys.stderr)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"완료: {len(paths)}건 중 성공 {len(paths) - failures}건, 실패 {failures}건 ({elapsed:.1f}s)", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import sys
+import json
+import time
+import random
+import argparse
+from ltv_engine import LOAN_STATUSES, parse_comma_number, parse_korean_number, evaluate_case, evaluate_sums, calculate_fees, build_memo
+from loan_table import LOAN_COLUMNS, loan_df_from_rows, normalize_loan_df, reconcile_loan_df, loan_sums_df, loan_items
+from ltv_map import region_map
+from portfolio import build_portfolio_frames, compute_portfolio
+
+# ─────────────────────────────
+# ⏱️ LTV 계산 엔진 벤치마크
+# ─────────────────────────────
+# 사용법:
+#   python bench_ltv_engine.py                               # 결과 표 출력
+#   python bench_ltv_engine.py --json bench.json             # 결과 저장
+#   python bench_ltv_engine.py --baseline bench.json         # 기준 대비 처리량이 떨어지면 종료 코드 1
+RATIOS = [90, 85, 80, 75, 70]
+
+# ------------------------------
+# 🔹 가상 포트폴리오
+# ------------------------------
+def synthetic_portfolio(n, seed=0, max_loans=5):
+    """(고객 데이터 dict, {page_id: [대출 행]}, [(시세, 방공제, items), ...]) 를 만듭니다."""
+    rng = random.Random(seed)
+    regions = list(region_map.keys())
+    customers, loans, cases = {}, {}, []
+    for idx in range(n):
+        price = rng.randrange(10000, 300000, 500)
+        region = rng.choice(regions)
+        page_id = f"page-{idx}"
+        rows = []
+        for _ in range(rng.randint(0, max_loans)):
+            ratio = rng.choice([110, 120, 130])
+            principal = rng.randrange(500, max(price // 3, 1000), 100)
+            rows.append((f"은행{rng.randint(1, 30)}", f"{principal * ratio // 100:,}", str(ratio), f"{principal:,}", rng.choice(LOAN_STATUSES)))
+        price_text = f"{price // 10000}억 {price % 10000 // 1000}천만" if rng.random() < 0.3 else f"{price:,}"
+        customers[f"고객{idx} 80{idx % 10}101"] = {"notion_page_id": page_id, "raw_price_input": price_text, "region": region}
+        loans[page_id] = rows
+        items = [dict(zip(["설정자", "채권최고액", "설정비율", "원금", "진행구분"], row)) for row in rows]
+        cases.append((price_text, region_map.get(region, 0), items))
+    return customers, loans, cases
+
+# ------------------------------
+# 🔹 측정
+# ------------------------------
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def bench_case(cases):
+    """한 건 (시세 해석 + 대출 표 보정 + 한도 계산 + 메모) 지연 시간. 화면과 같이 loan_table 경로로 계산합니다."""
+    fees = calculate_fees(1000, 1.5, 500, 0.7)
+    timings = []
+    for price_text, deduction, items in cases:
+        # 직전 실행의 표와, 첫 행의 원금을 고친 편집 결과 (표 준비는 측정에서 뺍니다)
+        prev = loan_df_from_rows([tuple(parse_comma_number(item[col]) if col in ("채권최고액", "원금", "설정비율") else item[col]
+                                        for col in LOAN_COLUMNS) for item in items])
+        edited = prev.copy()
+        edited.loc[0, "원금"] += 100
+        started = time.perf_counter()
+        total_value = parse_korean_number(price_text)
+        loan_df, _ = reconcile_loan_df(normalize_loan_df(edited), prev)
+        result = evaluate_sums(total_value, deduction, loan_sums_df(loan_df), RATIOS[:2], loan_items(loan_df))
+        build_memo("고객", "서울특별시 강남구", "84.97", price_text, 10, deduction, result, RATIOS[:2], fees)
+        timings.append(time.perf_counter() - started)
+    total = sum(timings)
+    return {
+        "cases": len(cases),
+        "cases_per_sec": round(len(cases) / total, 1),
+        "p50_us": round(_percentile(timings, 0.50) * 1e6, 1),
+        "p95_us": round(_percentile(timings, 0.95) * 1e6, 1),
+        "p99_us": round(_percentile(timings, 0.99) * 1e6, 1),
+    }
+
+def scalar_results(cases, ratios=RATIOS):
+    """evaluate_case 로 계산한 [(구분, 한도, 가용), ...] (고객 순서 × ratios 순서)"""
+    rows = []
+    for price_text, deduction, items in cases:
+        result = evaluate_case(parse_korean_number(price_text), deduction, items, ratios)
+        limits, path = (result.limit_sub, "후순위") if result.limit_sub else (result.limit_senior, "선순위")
+        rows.extend((path, *limits[ltv]) for ltv in ratios)
+    return rows
+
+def vector_results(customers, loans, ratios=RATIOS):
+    """portfolio.compute_portfolio 로 계산한 [(구분, 한도, 가용), ...] (scalar_results 와 같은 순서)"""
+    cust, loan_df = build_portfolio_frames(customers, loans)
+    result = compute_portfolio(cust, loan_df, ratios)
+    return list(zip(result["구분"], result["한도"].tolist(), result["가용"].tolist()))
+
+def check_same_results(customers, loans, cases):
+    """스칼라/벡터 경로의 결과가 다르면 처리량을 재기 전에 멈춥니다 (결과가 바뀐 속도 개선 방지)."""
+    scalar, vector = scalar_results(cases), vector_results(customers, loans)
+    mismatches = [(i // len(RATIOS), RATIOS[i % len(RATIOS)], a, b) for i, (a, b) in enumerate(zip(scalar, vector)) if a != b]
+    if len(scalar) != len(vector) or mismatches:
+        examples = ", ".join(f"고객{idx} LTV {ltv}%: {a} ≠ {b}" for idx, ltv, a, b in mismatches[:3])
+        raise AssertionError(f"스칼라/벡터 결과 불일치 {len(mismatches)}건 (행 수 {len(scalar)}/{len(vector)}) {examples}")
+
+def bench_batch_scalar(cases):
+    """모든 고객 × RATIOS 를 evaluate_case 로 한 건씩 계산"""
+    started = time.perf_counter()
+    for price_text, deduction, items in cases:
+        evaluate_case(parse_korean_number(price_text), deduction, items, RATIOS)
+    seconds = time.perf_counter() - started
+    return {"seconds": round(seconds, 4), "cells_per_sec": round(len(cases) * len(RATIOS) / seconds, 1)}
+
+def bench_batch_vector(customers, loans):
+    """모든 고객 × RATIOS 를 portfolio.compute_portfolio 로 한 번에 계산 (표 구성 포함)"""
+    started = time.perf_counter()
+    cust, loan_df = build_portfolio_frames(customers, loans)
+    compute_portfolio(cust, loan_df, RATIOS)
+    seconds = time.perf_counter() - started
+    return {"seconds": round(seconds, 4), "cells_per_sec": round(len(customers) * len(RATIOS) / seconds, 1)}
+
+def _best(measure, repeat, key):
+    """repeat 번 측정해 처리량이 가장 좋은 결과를 씁니다 (다른 프로세스 부하로 인한 흔들림 완화)."""
+    return max((measure() for _ in range(repeat)), key=lambda r: r[key])
+
+def run(sizes, seed, repeat=3):
+    results = {}
+    for n in sizes:
+        customers, loans, cases = synthetic_portfolio(n, seed)
+        check_same_results(customers, loans, cases)
+        results[str(n)] = {
+            "case": _best(lambda: bench_case(cases), repeat, "cases_per_sec"),
+            "batch_scalar": _best(lambda: bench_batch_scalar(cases), repeat, "cells_per_sec"),
+            "batch_vector": _best(lambda: bench_batch_vector(customers, loans), repeat, "cells_per_sec"),
+        }
+    return results
+
+# ------------------------------
+# 🔹 기준 비교
+# ------------------------------
+# 처리량 비교에 쓰는 지표
+THROUGHPUT_KEYS = {"case": "cases_per_sec", "batch_scalar": "cells_per_sec", "batch_vector": "cells_per_sec"}
+
+def compare(results, baseline, tolerance):
+    """기준보다 처리량이 tolerance 비율 이상 떨어진 항목 목록"""
+    regressions = []
+    for size, groups in results.items():
+        for group, key in THROUGHPUT_KEYS.items():
+            old = baseline.get(size, {}).get(group, {}).get(key)
+            new = groups[group][key]
+            if old and new < old * (1 - tolerance):
+                regressions.append(f"{size}건 {group}: {old:,.0f} → {new:,.0f} {key}")
+    return regressions
+
+def print_table(results):
+    print(f"{'고객 수':>8} | {'건당 p50':>10} | {'건당 p95':>10} | {'건/초':>10} | {'일괄(스칼라)':>12} | {'일괄(벡터)':>12}")
+    for size, r in results.items():
+        print(f"{int(size):>8,} | {r['case']['p50_us']:>8.1f}µs | {r['case']['p95_us']:>8.1f}µs | "
+              f"{r['case']['cases_per_sec']:>10,.0f} | {r['batch_scalar']['seconds']:>11.3f}s | {r['batch_vector']['seconds']:>11.3f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LTV 계산 엔진 처리량 벤치마크")
+    parser.add_argument("--sizes", default="100,1000,10000", help="가상 포트폴리오 고객 수 (쉼표 구분)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (가장 좋은 값 사용)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 기준 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 처리량 감소 비율 (기본 0.2)")
+    args = parser.parse_args(argv)
+
+    results = run([int(s) for s in args.sizes.split(",") if s.strip()], args.seed, args.repeat)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"⚠️ 성능 저하: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
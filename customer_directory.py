@@ -0,0 +1,66 @@
+import time
+import threading
+
+# ─────────────────────────────
+# 👥 프로세스 공유 고객 목록 캐시
+# ─────────────────────────────
+class CustomerDirectory:
+    """모든 브라우저 세션이 함께 쓰는 {고객명: 데이터} 캐시.
+
+    TTL 이 지나면 처음 요청한 세션 하나만 loader 를 호출해 새로 채우고,
+    저장/삭제 직후에는 전체를 다시 읽지 않고 바뀐 고객만 고쳐 넣습니다.
+    """
+
+    def __init__(self, loader, ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._data = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_stale(self):
+        return self._data is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def get(self):
+        if self._is_stale():
+            if self._data is not None:
+                # 다른 세션이 이미 새로 받는 중이면 기다리지 않고 지금 목록을 씁니다.
+                if not self._lock.acquire(blocking=False):
+                    return self._data
+                try:
+                    if self._is_stale():
+                        self._load()
+                finally:
+                    self._lock.release()
+            else:
+                # 아직 한 번도 받지 않았을 때만 첫 조회가 끝날 때까지 기다립니다.
+                with self._lock:
+                    if self._is_stale():
+                        self._load()
+        return self._data
+
+    def refresh(self):
+        with self._lock:
+            self._load()
+        return self._data
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _load(self):
+        self._data = self.loader()
+        self._loaded_at = time.monotonic()
+
+    def apply(self, upserts, removals=()):
+        """upserts: [(page_id, 고객명, 데이터, last_edited_time), ...], removals: [page_id, ...]"""
+        with self._lock:
+            if self._data is None:
+                return
+            gone = {page_id for page_id, _, _, _ in upserts} | set(removals)
+            # 읽는 중인 세션이 있을 수 있으므로 기존 dict 를 고치지 않고 새로 만들어 교체합니다.
+            data = {name: customer for page_id, name, customer, _ in upserts}
+            for name, customer in self._data.items():
+                if name not in data and customer.get("notion_page_id") not in gone:
+                    data[name] = customer
+            self._data = data
@@ -0,0 +1,73 @@
+import re
+from bisect import bisect_right
+
+# ─────────────────────────────
+# 🔎 고객 검색 색인
+# ─────────────────────────────
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_SPACE_RE = re.compile(r"\s+")
+
+def _normalize(text):
+    return _SPACE_RE.sub("", str(text or "")).lower()
+
+def _query_pattern(query):
+    """검색어 → 정규식. 초성 글자(ㄱ~ㅎ)는 그 초성으로 시작하는 모든 음절과 일치합니다."""
+    parts = []
+    for ch in query:
+        idx = _CHOSUNG.find(ch)
+        if idx >= 0:
+            start = 0xAC00 + idx * 588
+            parts.append(f"[{ch}{chr(start)}-{chr(start + 587)}]")
+        else:
+            parts.append(re.escape(ch))
+    # 겹치는 위치도 모두 찾도록 전방 탐색으로 감쌉니다.
+    return re.compile(f"(?=({''.join(parts)}))")
+
+
+class CustomerSearchIndex:
+    """고객명·생년월일·주소를 필드별 하나의 문자열로 이어 붙여 두고, 정규식 한 번으로 찾습니다.
+
+    토큰(사람 이름, 주소 단어)의 맨 앞에서 일치하면 접두어 일치로 보고 더 높은 순위를 줍니다.
+    """
+
+    def __init__(self, customers):
+        self.keys = list(customers.keys())
+        self.blobs, self.offsets = [], []
+        columns = ([], [], [])
+        for key in self.keys:
+            # 고객명 키는 "홍길동 800101, 김철수 750505" 처럼 여러 사람을 담을 수 있습니다.
+            owners = [part.strip() for part in str(key).split(",") if part.strip()]
+            # 필드 순서가 곧 검색 우선순위입니다 (이름 > 생년월일 > 주소).
+            token_lists = (
+                owners,
+                [re.sub(r"\D", "", o) for o in owners],
+                str(customers[key].get("address_input", "")).split(),
+            )
+            for column, raw_tokens in zip(columns, token_lists):
+                column.append(" ".join(t for t in (_normalize(t) for t in raw_tokens) if t))
+        for column in columns:
+            offsets, pos = [], 0
+            for text in column:
+                offsets.append(pos)
+                pos += len(text) + 1
+            self.blobs.append("\n".join(column))
+            self.offsets.append(offsets)
+
+    def search(self, query, offset=0, limit=20):
+        """(이번 페이지의 고객명 목록, 전체 일치 건수)를 반환합니다."""
+        q = _normalize(query)
+        if not q:
+            return self.keys[offset:offset + limit], len(self.keys)
+
+        pattern = _query_pattern(q)
+        best = {}
+        for rank, (blob, offsets) in enumerate(zip(self.blobs, self.offsets)):
+            for m in pattern.finditer(blob):
+                pos = m.start()
+                entry = bisect_right(offsets, pos) - 1
+                prefix = pos == offsets[entry] or blob[pos - 1] == " "
+                score = rank * 2 + (0 if prefix else 1)
+                if score < best.get(entry, 99):
+                    best[entry] = score
+        ranked = sorted(best, key=lambda entry: (best[entry], entry))
+        return [self.keys[entry] for entry in ranked[offset:offset + limit]], len(ranked)
@@ -0,0 +1,207 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from local_store import CACHE_DIR
+from session_lease import SessionLeases
+
+# ─────────────────────────────
+# 💾 업로드 PDF / 렌더 이미지 디스크 저장소
+# ─────────────────────────────
+# 업로드한 PDF와 렌더링한 페이지 PNG를 CACHE_DIR/files 아래에 내용 해시 이름으로 보관합니다.
+#   - 전체 크기가 DISK_STORE_MAX_MB 를 넘으면 가장 오래 사용되지 않은 파일부터 지웁니다 (LRU).
+#     지금 세션이 보고 있는 PDF는 가능한 한 남기고, 그래도 넘치면 함께 지웁니다.
+#   - 마지막 사용 후 DISK_STORE_MAX_AGE_HOURS 시간이 지난 파일은 지웁니다.
+#   - 세션이 끝나거나 다른 PDF로 바뀌면, 더 이상 아무 세션도 쓰지 않는 PDF와 그 렌더 이미지를 바로 지웁니다.
+DISK_STORE_DIR = os.path.join(CACHE_DIR, "files")
+DISK_STORE_MAX_MB = int(os.environ.get("LTV_DISK_STORE_MB", "512"))
+DISK_STORE_MAX_AGE_HOURS = float(os.environ.get("LTV_DISK_STORE_MAX_AGE_HOURS", "24"))
+# 오래된 파일 정리는 저장할 때마다 하지 않고 이 간격(초)마다 합니다.
+SWEEP_INTERVAL = 60.0
+
+def _render_name(pdf_hash, page_num, zoom):
+    return f"{pdf_hash}_{page_num}_{zoom:g}.png"
+
+# ------------------------------
+# 🔹 저장소
+# ------------------------------
+class DiskStore:
+    """크기/나이 상한이 있는 내용 주소 방식 파일 저장소 (프로세스 안에서 스레드 안전)"""
+
+    def __init__(self, root, max_bytes, max_age):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()   # 파일 이름 → [크기, 마지막 사용 시각] (오래 안 쓴 순)
+        self._size = 0
+        self._owners = {}               # 세션 식별자 → 보고 있는 PDF 해시
+        self._leases = SessionLeases()  # 끝난 세션은 다음 저장/조회 때 정리
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0, "released": 0}
+        self._scan()
+
+    def _scan(self):
+        """이전 실행에서 남은 파일을 색인에 올립니다 (마지막 사용 시각은 수정 시각으로 봅니다)."""
+        os.makedirs(self.root, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                if entry.name.endswith(".tmp"):
+                    os.remove(entry.path)
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for mtime, name, size in sorted(found):
+            self._entries[name] = [size, mtime]
+            self._size += size
+        self._evict()
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    # --- 읽기 / 쓰기 ---
+    def get(self, name):
+        """저장된 파일 경로 (없으면 None). 사용 시각을 갱신합니다."""
+        with self._lock:
+            path = self._touch(name)
+            self.stats["hits" if path else "misses"] += 1
+            return path
+
+    def _touch(self, name):
+        entry = self._entries.get(name)
+        if entry is None or not os.path.exists(self.path(name)):
+            if entry is not None:
+                self._drop(name)
+            return None
+        entry[1] = time.time()
+        self._entries.move_to_end(name)
+        return self.path(name)
+
+    def put(self, name, data):
+        """data 를 저장하고 경로를 반환합니다. 같은 이름이 이미 있으면 다시 쓰지 않습니다."""
+        self._release_ended()
+        if len(data) > self.max_bytes:
+            return None
+        with self._lock:
+            existing = self._touch(name)
+        if existing is not None:
+            return existing
+        # 읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일에 쓴 뒤 바꿔치기합니다.
+        tmp = self.path(f"{name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path(name))
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._size -= old[0]
+            self._entries[name] = [len(data), time.time()]
+            self._size += len(data)
+            self.stats["writes"] += 1
+            self._evict()
+        self.sweep()
+        return self.path(name)
+
+    # --- PDF / 렌더 이미지 ---
+    def put_pdf(self, pdf_hash, data, owner=None):
+        """업로드 PDF를 저장합니다. owner 를 주면 그 세션이 이 PDF를 보고 있는 것으로 기록합니다."""
+        if owner is not None:
+            self.switch(owner, pdf_hash)
+        return self.put(f"{pdf_hash}.pdf", data)
+
+    def get_pdf(self, pdf_hash):
+        return self.get(f"{pdf_hash}.pdf")
+
+    def get_render(self, pdf_hash, page_num, zoom):
+        """렌더 PNG 바이트 (없으면 None)"""
+        path = self.get(_render_name(pdf_hash, page_num, zoom))
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_render(self, pdf_hash, page_num, zoom, png):
+        return self.put(_render_name(pdf_hash, page_num, zoom), png)
+
+    # --- 세션 ---
+    def switch(self, owner, pdf_hash):
+        """세션이 보는 PDF를 바꿉니다. 이전 PDF를 더 쓰는 세션이 없으면 지웁니다."""
+        with self._lock:
+            previous = self._owners.get(owner)
+            self._owners[owner] = pdf_hash
+        if previous and previous != pdf_hash:
+            self._forget(previous)
+
+    def release(self, owner):
+        """세션이 끝났을 때: 그 세션만 보던 PDF와 렌더 이미지를 지웁니다."""
+        with self._lock:
+            previous = self._owners.pop(owner, None)
+        if previous:
+            self._forget(previous)
+
+    def lease(self, owner):
+        """세션 상태에 넣어 둘 토큰. 세션 상태가 사라지면(세션 종료/초기화) 그 세션을 release() 합니다."""
+        return self._leases.lease(owner)
+
+    def _release_ended(self):
+        self._leases.release_ended(self.release)
+
+    def _forget(self, pdf_hash):
+        with self._lock:
+            if pdf_hash in self._owners.values():
+                return
+            for name in [n for n in self._entries if n.startswith(pdf_hash)]:
+                self._drop(name)
+                self.stats["released"] += 1
+
+    # --- 정리 ---
+    def _pinned(self, name):
+        return name.split("_", 1)[0].split(".", 1)[0] in self._owners.values()
+
+    def _drop(self, name):
+        size, _ = self._entries.pop(name)
+        self._size -= size
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+
+    def _evict(self):
+        # 1차: 보고 있는 세션이 없는 파일부터, 2차: 그래도 넘치면 나머지도 오래된 순으로 지웁니다.
+        for spare_pinned in (True, False):
+            if self._size <= self.max_bytes:
+                return
+            for name in list(self._entries):
+                if self._size <= self.max_bytes:
+                    return
+                if spare_pinned and self._pinned(name):
+                    continue
+                self._drop(name)
+                self.stats["evictions"] += 1
+
+    def sweep(self, force=False):
+        """마지막 사용 후 max_age 초가 지난 파일을 지웁니다."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_sweep < SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+            for name, (_, used) in list(self._entries.items()):
+                # 오래 안 쓴 순서이므로 기준 안쪽 항목을 만나면 멈춥니다.
+                if now - used < self.max_age:
+                    break
+                self._drop(name)
+                self.stats["expired"] += 1
+
+    def summary(self):
+        self._release_ended()
+        with self._lock:
+            return {**self.stats, "files": len(self._entries), "bytes": self._size, "sessions": len(self._owners)}
+
+
+# 프로세스 안의 모든 세션이 같은 디렉터리와 상한을 나눠 씁니다.
+disk_store = DiskStore(DISK_STORE_DIR, DISK_STORE_MAX_MB * 1024 * 1024, DISK_STORE_MAX_AGE_HOURS * 3600)
@@ -0,0 +1,72 @@
+import json
+import time
+from contextlib import closing
+
+from local_store import connect
+from registry_parser import PARSER_VERSION, process_pdf
+from pdf_documents import PdfHandle, mupdf_lock
+
+# ─────────────────────────────
+# 🗃️ PDF 추출 결과 캐시 (내용 해시 기준)
+# ─────────────────────────────
+DB_FILE = "extraction_cache.sqlite3"
+
+def _connect():
+    conn = connect(DB_FILE)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS extractions (
+            pdf_hash TEXT NOT NULL,
+            parser_version INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (pdf_hash, parser_version)
+        )"""
+    )
+    return conn
+
+def get_cached_extraction(pdf_hash):
+    """같은 내용의 PDF를 이전에 추출한 적이 있으면 그 결과를 반환합니다."""
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT result FROM extractions WHERE pdf_hash = ? AND parser_version = ?",
+                (pdf_hash, PARSER_VERSION),
+            ).fetchone()
+    except Exception:
+        return None
+    return json.loads(row[0]) if row else None
+
+def save_extraction(pdf_hash, result):
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)",
+                (pdf_hash, PARSER_VERSION, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+    except Exception:
+        # 캐시 저장 실패는 추출 결과에 영향을 주지 않습니다.
+        pass
+
+def extract_pdf_cached(pdf, pdf_hash):
+    """캐시에 있으면 바로 반환하고, 없으면 PDF를 분석해 캐시에 저장합니다.
+
+    pdf: PDF 바이트 또는 pdf_documents 의 PdfHandle (미리보기와 같은 열린 문서를 그대로 씁니다)
+    """
+    result = get_cached_extraction(pdf_hash)
+    if result is not None:
+        return result
+    if isinstance(pdf, PdfHandle):
+        with mupdf_lock:
+            _, external_links, address, area, floor, co_owners, liens = process_pdf(pdf.doc)
+    else:
+        _, external_links, address, area, floor, co_owners, liens = process_pdf(pdf)
+    result = {
+        "address": address,
+        "area": area,
+        "floor": floor,
+        "co_owners": [list(owner) for owner in co_owners],
+        "liens": [list(lien) for lien in liens],
+        "external_links": external_links,
+    }
+    save_extraction(pdf_hash, result)
+    return result
@@ -1,8 +1,16 @@
 import os
-import re
-import requests
+import time
 import streamlit as st
 from datetime import datetime
+from customer_directory import CustomerDirectory
+from customer_search import CustomerSearchIndex
+from loan_index import LoanIndex
+from ltv_engine import parse_comma_number
+from loan_table import empty_loan_df, loan_df_from_rows, loan_rows
+from notion_client import NotionClient
+from notion_mirror import CustomerMirror
+from notion_writer import NotionWriteExecutor
+from notion_outbox import NotionOutbox
 
 # ─────────────────────────────
 # 🔐 Notion API 설정
@@ -16,11 +24,14 @@ CUSTOMER_DB_TITLE_PROPERTY_NAME = "고객명"
 CUSTOMER_DB_ADDRESS_PROPERTY_NAME = "주소"
 LOAN_DB_RELATION_PROPERTY_NAME = "연결된 고객" 
 
-NOTION_HEADERS = {
-    "Authorization": f"Bearer {NOTION_TOKEN}",
-    "Content-Type": "application/json",
-    "Notion-Version": "2022-06-28"
-}
+# 증분 동기화로는 다른 곳에서 보관(삭제)된 페이지를 알 수 없으므로 주기적으로 전체를 다시 받습니다.
+FULL_RESYNC_INTERVAL = 6 * 60 * 60
+# 세션들이 공유하는 고객 목록을 Notion과 다시 맞춰보는 주기 (초)
+CUSTOMER_CACHE_TTL = int(os.environ.get("LTV_CUSTOMER_CACHE_TTL", "60"))
+
+# 모든 조회/저장/삭제가 같은 연결 풀을 공유합니다.
+notion = NotionClient(NOTION_TOKEN)
+notion_writer = NotionWriteExecutor(notion)
 
 # ───────────────────────────────────────────────
 # 🔑 Notion 속성명 → Streamlit 세션 키 매핑
@@ -42,13 +53,12 @@ KEY_MAP = {
     "브릿지 수수료율": "bridge_rate",
 }
 
+# 고객을 불러올 때 지우지 않는 세션 키 (app.py 에서 만드는 세션 식별자와 파일 임대 토큰)
+SESSION_KEYS_KEPT_ON_LOAD = ("prefetch_owner", "disk_lease", "pdf_lease")
+
 # ------------------------------
 # 🔹 유틸 함수
 # ------------------------------
-def parse_comma_number(text):
-    try: return int(re.sub(r"[^\d]", "", str(text)))
-    except: return 0
-
 def get_properties_payload():
     """세션 상태에서 Notion에 보낼 데이터 페이로드를 생성하는 헬퍼 함수"""
     co_owners_list = st.session_state.get("co_owners", [])
@@ -78,49 +88,106 @@ def get_properties_payload():
 # ─────────────────────────────
 # 🧾 고객 목록 및 불러오기 관련 함수
 # ─────────────────────────────
+def get_customers():
+    """모든 세션이 공유하는 {고객명: 데이터} (읽기 전용으로 사용)"""
+    return customer_directory.get()
+
 def get_customer_options():
-    return list(st.session_state.get("notion_customers", {}).keys())
+    return list(get_customers().keys())
 
-def fetch_all_notion_customers():
-    notion_customers = {}
+_search_index = (None, None)
+
+def search_customers(query, offset=0, limit=20):
+    """이름·생년월일·주소·초성으로 고객을 찾아 (이번 페이지 고객명 목록, 전체 건수)를 반환합니다."""
+    global _search_index
+    customers = get_customers()
+    indexed, index = _search_index
+    # 공유 목록은 바뀔 때마다 새 dict 로 교체되므로, 같은 객체이면 색인을 다시 쓸 수 있습니다.
+    if indexed is not customers:
+        index = CustomerSearchIndex(customers)
+        _search_index = (customers, index)
+    return index.search(query, offset, limit)
+
+customer_mirror = CustomerMirror(NOTION_DB_ID)
+
+def parse_customer_page(page):
+    """Notion 고객 페이지를 (고객명, 데이터)로 변환합니다. 고객명이 없으면 None."""
+    props = page.get("properties", {}); customer = {}
+    name_prop = props.get(CUSTOMER_DB_TITLE_PROPERTY_NAME, {}).get("title", [])
+    if not name_prop:
+        return None
+    customer_name_key = name_prop[0].get("text", {}).get("content", "")
+    if not customer_name_key:
+        return None
+    customer["notion_page_id"] = page["id"]
+    for prop_name, app_key in KEY_MAP.items():
+        if prop_name in props:
+            value = props[prop_name]; content = None
+            if value.get("rich_text"): content = value["rich_text"][0]["text"]["content"] if value["rich_text"] else ""
+            elif value.get("title"): content = value["title"][0]["text"]["content"] if value["title"] else ""
+            elif value.get("number") is not None: content = value["number"]
+            elif value.get("date"): content = value.get("date", {}).get("start")
+            if content is not None: customer[app_key] = content
+    return customer_name_key, customer
+
+def _customer_changes(pages):
+    """고객 페이지들 → (반영할 항목, 지울 page_id) 목록"""
+    upserts, removals = [], []
+    for page in pages:
+        parsed = None if page.get("archived") or page.get("in_trash") else parse_customer_page(page)
+        if parsed:
+            name, customer = parsed
+            upserts.append((page["id"], name, customer, page.get("last_edited_time", "")))
+        else:
+            removals.append(page["id"])
+    return upserts, removals
+
+def apply_customer_pages(pages):
+    """저장/삭제 응답으로 받은 고객 페이지들을 로컬 미러와 공유 고객 목록에 바로 반영합니다.
+
+    동기화 워터마크는 옮기지 않습니다 (다음 증분 동기화가 그 사이 다른 곳의 수정분도 받도록).
+    """
+    upserts, removals = _customer_changes(pages)
+    customer_mirror.apply(upserts, removals)
+    customer_directory.apply(upserts, removals)
+
+def sync_customer_mirror():
+    """마지막 동기화 이후 수정된 페이지만 받아 미러에 반영합니다 (처음이거나 주기가 지나면 전체)."""
+    watermark = customer_mirror.watermark
+    full = watermark is None or time.time() - customer_mirror.last_full_sync > FULL_RESYNC_INTERVAL
+    query_filter = None if full else {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+    pages = list(notion.query_database(NOTION_DB_ID, filter=query_filter))
+    upserts, removals = _customer_changes(pages)
+    customer_mirror.apply(upserts, removals, full=full, from_query=True)
+
+def _load_customer_directory():
     try:
-        query_url = f"https://api.notion.com/v1/databases/{NOTION_DB_ID}/query"
-        has_more = True; next_cursor = None
-        while has_more:
-            payload = {"page_size": 100}
-            if next_cursor: payload["start_cursor"] = next_cursor
-            res = requests.post(query_url, headers=NOTION_HEADERS, json=payload)
-            res.raise_for_status()
-            data = res.json()
-            for page in data.get("results", []):
-                props = page.get("properties", {}); customer = {}
-                name_prop = props.get(CUSTOMER_DB_TITLE_PROPERTY_NAME, {}).get("title", [])
-                if name_prop:
-                    customer_name_key = name_prop[0].get("text", {}).get("content", "")
-                    if not customer_name_key: continue
-                    customer["notion_page_id"] = page["id"]
-                    for prop_name, app_key in KEY_MAP.items():
-                        if prop_name in props:
-                            value = props[prop_name]; content = None
-                            if value.get("rich_text"): content = value["rich_text"][0]["text"]["content"] if value["rich_text"] else ""
-                            elif value.get("title"): content = value["title"][0]["text"]["content"] if value["title"] else ""
-                            elif value.get("number") is not None: content = value["number"]
-                            elif value.get("date"): content = value.get("date", {}).get("start")
-                            if content is not None: customer[app_key] = content
-                    notion_customers[customer_name_key] = customer
-            has_more = data.get("has_more", False)
-            next_cursor = data.get("next_cursor")
+        sync_customer_mirror()
     except Exception as e:
         st.warning(f"❗ Notion 데이터 조회 실패: {e}")
-    st.session_state["notion_customers"] = notion_customers
+    try:
+        return customer_mirror.load_all()
+    except Exception as e:
+        st.warning(f"❗ 로컬 고객 목록을 읽지 못했습니다: {e}")
+        return {}
+
+customer_directory = CustomerDirectory(_load_customer_directory, CUSTOMER_CACHE_TTL)
+
+def fetch_all_notion_customers():
+    """공유 고객 목록을 즉시 Notion과 다시 맞춥니다."""
+    customer_directory.refresh()
 
 def load_customer_input(customer_name):
-    customer_data = st.session_state.get("notion_customers", {}).get(customer_name)
+    customer_data = get_customers().get(customer_name)
     if not customer_data:
         st.warning("해당 고객 데이터를 찾을 수 없습니다.")
         return
     
+    # 세션 식별자와 업로드 파일 임대는 남겨 둡니다. 지우면 이 세션이 끝난 것으로 보고
+    # 보고 있던 PDF와 렌더 이미지를 지운 뒤 같은 파일을 다시 열고 다시 그리게 됩니다.
+    kept = {key: st.session_state[key] for key in SESSION_KEYS_KEPT_ON_LOAD if key in st.session_state}
     st.session_state.clear()
+    st.session_state.update(kept)
     
     for key, value in customer_data.items():
         if key != "notion_page_id":
@@ -137,65 +204,180 @@ def load_customer_input(customer_name):
     if customer_page_id:
         load_loan_items(customer_page_id)
 
-    if "num_loan_items" not in st.session_state:
-        st.session_state.num_loan_items = 1
+    if "loan_df" not in st.session_state:
+        st.session_state["loan_df"] = empty_loan_df()
 
     st.session_state.just_loaded = True
 
+def _load_loan_pages(watermark):
+    """대출 DB를 관계 조건 없이 한 번에 훑습니다 (watermark 가 있으면 그 이후 수정분만)."""
+    query_filter = None if watermark is None else {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+    return list(notion.query_database(NOTION_DB_ID_LOAN, filter=query_filter))
+
+loan_index = LoanIndex(_load_loan_pages, LOAN_DB_RELATION_PROPERTY_NAME, CUSTOMER_CACHE_TTL, FULL_RESYNC_INTERVAL)
+
+def prefetch_loan_index():
+    """고객을 고르는 동안 대출 색인을 백그라운드에서 미리 채워 둡니다."""
+    loan_index.warm()
+
+def get_portfolio_inputs():
+    """전체 고객 일괄 계산용 ({고객명: 데이터}, {고객 page_id: [대출 행, ...]})"""
+    loans = loan_index.all_by_customer()
+    return get_customers(), {owner: [loan_row_from_page(page) for page in pages] for owner, pages in loans.items()}
+
+def loan_row_from_page(page):
+    """대출 페이지 → (설정자, 채권최고액, 설정비율, 원금, 진행구분)"""
+    props = page.get("properties", {})
+    title = props.get("설정자", {}).get("title") or [{}]
+    status = props.get("진행구분", {}).get("rich_text") or [{}]
+    return (
+        title[0].get("text", {}).get("content", ""),
+        props.get("채권최고액", {}).get("number") or 0,
+        props.get("설정비율", {}).get("number") or 0,
+        props.get("원금", {}).get("number") or 0,
+        status[0].get("text", {}).get("content", "유지"),
+    )
+
 def load_loan_items(customer_page_id):
     try:
-        loan_query_url = f"https://api.notion.com/v1/databases/{NOTION_DB_ID_LOAN}/query"
-        payload = {"filter": {"property": LOAN_DB_RELATION_PROPERTY_NAME, "relation": {"contains": customer_page_id}}}
-        res = requests.post(loan_query_url, headers=NOTION_HEADERS, json=payload)
-        res.raise_for_status()
-        loan_data = res.json().get("results", [])
-
-        st.session_state["num_loan_items"] = len(loan_data) if loan_data else 1
-
-        for i, item in enumerate(loan_data):
-            props = item.get("properties", {})
-            st.session_state[f"lender_{i}"] = props.get("설정자", {}).get("title", [{}])[0].get("text", {}).get("content", "")
-            st.session_state[f"maxamt_{i}"] = f"{props.get('채권최고액', {}).get('number', 0):,}"
-            st.session_state[f"ratio_{i}"] = str(props.get("설정비율", {}).get("number", ""))
-            st.session_state[f"principal_{i}"] = f"{props.get('원금', {}).get('number', 0):,}"
-            st.session_state[f"status_{i}"] = props.get("진행구분", {}).get("rich_text", [{}])[0].get("text", {}).get("content", "유지")
+        loan_data = loan_index.get(customer_page_id)
+        df = loan_df_from_rows([loan_row_from_page(item) for item in loan_data], [item["id"] for item in loan_data])
+        st.session_state["loan_df"] = df
     except Exception as e:
         st.error(f"❌ 대출 항목 불러오기 실패: {e}")
 
 # ─────────────────────────────
 # 💾 저장/수정/삭제 관련 함수
 # ─────────────────────────────
+# 버튼을 누르면 요청을 로컬 대기열(notion_outbox)에 기록하고 바로 돌아옵니다.
+# 실제 Notion 반영은 백그라운드 워커가 고객별로 순서대로 하며, 실패하면 다시 시도합니다.
 
-def save_loan_items(customer_page_id):
-    try:
-        loan_query_url = f"https://api.notion.com/v1/databases/{NOTION_DB_ID_LOAN}/query"
-        payload = {"filter": {"property": LOAN_DB_RELATION_PROPERTY_NAME, "relation": {"contains": customer_page_id}}}
-        res = requests.post(loan_query_url, headers=NOTION_HEADERS, json=payload)
-        res.raise_for_status()
-        for page in res.json().get("results", []):
-            archive_url = f"https://api.notion.com/v1/pages/{page['id']}"
-            requests.patch(archive_url, headers=NOTION_HEADERS, json={"archived": True})
-        
-        num_items = st.session_state.get("num_loan_items", 0)
-        for i in range(num_items):
-            lender = st.session_state.get(f"lender_{i}", "").strip()
-            if not lender: continue
-
-            loan_payload = {
-                "parent": {"database_id": NOTION_DB_ID_LOAN},
-                "properties": {
-                    "설정자": {"title": [{"text": {"content": lender}}]},
-                    "채권최고액": {"number": parse_comma_number(st.session_state.get(f"maxamt_{i}", "0"))},
-                    "설정비율": {"number": int(st.session_state.get(f"ratio_{i}", "0") or 0)},
-                    "원금": {"number": parse_comma_number(st.session_state.get(f"principal_{i}", "0"))},
-                    "진행구분": {"rich_text": [{"text": {"content": st.session_state.get(f"status_{i}", "유지")}}]},
-                    LOAN_DB_RELATION_PROPERTY_NAME: {"relation": [{"id": customer_page_id}]}
-                }
-            }
-            res = requests.post("https://api.notion.com/v1/pages", headers=NOTION_HEADERS, json=loan_payload)
-            res.raise_for_status()
-    except Exception as e:
-        st.warning(f"⚠️ 대출 항목 저장 중 오류 발생: {e}")
+def _archive_calls(pages):
+    return [(f"보관 {page['id']}", "PATCH", f"pages/{page['id']}", {"archived": True}) for page in pages]
+
+def _loan_properties(row, customer_page_id):
+    lender, max_amt, ratio, principal, status = row
+    return {
+        "설정자": {"title": [{"text": {"content": lender}}]},
+        "채권최고액": {"number": max_amt},
+        "설정비율": {"number": ratio},
+        "원금": {"number": principal},
+        "진행구분": {"rich_text": [{"text": {"content": status}}]},
+        LOAN_DB_RELATION_PROPERTY_NAME: {"relation": [{"id": customer_page_id}]}
+    }
+
+def _match_loans(desired, existing):
+    """원하는 대출 행을 기존 대출 페이지에 짝지어 {행 번호: page_id} 와 남는 page_id 목록을 돌려줍니다.
+
+    page_id 가 같은 페이지 → 내용이 같은 페이지 → 남은 페이지 순으로 짝지어,
+    다시 시도하거나 페이지 ID를 모르는 행을 저장해도 같은 항목을 새로 만들지 않습니다.
+    """
+    free = dict(existing)
+    matched = {}
+    for i, (page_id, _) in enumerate(desired):
+        if page_id in free:
+            matched[i] = page_id
+            free.pop(page_id)
+    for i, (_, row) in enumerate(desired):
+        if i not in matched:
+            same = next((page_id for page_id, existing_row in free.items() if existing_row == row), None)
+            if same:
+                matched[i] = same
+                free.pop(same)
+    leftovers = [i for i in range(len(desired)) if i not in matched]
+    for i, page_id in zip(leftovers, list(free)):
+        matched[i] = page_id
+        free.pop(page_id)
+    return matched, list(free)
+
+def _query_loan_pages(customer_page_id):
+    """고객의 대출 페이지를 관계 조건으로 지금 다시 조회하고 공유 색인의 해당 고객 항목도 바꿉니다.
+
+    색인은 최대 CUSTOMER_CACHE_TTL 만큼 오래되었을 수 있으므로, 쓰기 전에는 색인 대신 이 결과와 비교합니다.
+    """
+    query_filter = {"property": LOAN_DB_RELATION_PROPERTY_NAME, "relation": {"contains": customer_page_id}}
+    pages = list(notion.query_database(NOTION_DB_ID_LOAN, filter=query_filter))
+    loan_index.replace(customer_page_id, pages)
+    return pages
+
+def sync_loan_items(customer_page_id, desired):
+    """고객의 대출 페이지를 desired [(page_id|None, 행), ...] 와 같게 맞춥니다.
+
+    생성/수정이 모두 성공한 뒤에만 남는 항목을 보관하므로, 중간에 실패해도 대출 항목이 비지 않습니다.
+    실패하면 예외를 올리고, 다시 시도하면 그때의 Notion 상태와 다시 비교합니다.
+    """
+    existing = {page["id"]: loan_row_from_page(page) for page in _query_loan_pages(customer_page_id)}
+    matched, removed = _match_loans(desired, existing)
+    calls = []
+    for i, (_, row) in enumerate(desired):
+        page_id = matched.get(i)
+        if page_id is None:
+            payload = {"parent": {"database_id": NOTION_DB_ID_LOAN}, "properties": _loan_properties(row, customer_page_id)}
+            calls.append((f"생성 {row[0]}", "POST", "pages", payload))
+        elif existing[page_id] != row:
+            calls.append((f"수정 {row[0]}", "PATCH", f"pages/{page_id}", {"properties": _loan_properties(row, customer_page_id)}))
+    report = notion_writer.run(calls)
+    loan_index.apply([result.response for result in report.results if result.ok])
+    if not report.ok:
+        raise RuntimeError(f"대출 항목 저장 실패 ({report.summary()})")
+
+    report = notion_writer.run(_archive_calls([{"id": page_id} for page_id in removed]))
+    loan_index.apply([], [page_id for page_id, result in zip(removed, report.results) if result.ok])
+    if not report.ok:
+        raise RuntimeError(f"대출 항목 보관 실패 ({report.summary()})")
+
+def _customer_page_id(payload):
+    """요청에 페이지 ID가 없으면(신규 저장이 아직 반영되기 전 등) 고객명으로 찾습니다."""
+    return payload.get("page_id") or (get_customers().get(payload["customer_name"]) or {}).get("notion_page_id")
+
+def _flush_save(payload, checkpoint):
+    page_id = _customer_page_id(payload)
+    if page_id:
+        page = notion.update_page(page_id, {"properties": payload["properties"]})
+    else:
+        page = notion.create_page({"parent": {"database_id": NOTION_DB_ID}, "properties": payload["properties"]})
+        page_id = page["id"]
+        # 대출 항목 저장이 실패해 다시 시도할 때 고객 페이지를 또 만들지 않도록 기록해 둡니다.
+        checkpoint({**payload, "page_id": page_id})
+    apply_customer_pages([page])
+    sync_loan_items(page_id, [(loan_page_id, tuple(row)) for loan_page_id, row in payload["loans"]])
+
+def _flush_delete(payload, checkpoint):
+    page_id = _customer_page_id(payload)
+    if not page_id:
+        return
+    loan_pages = _query_loan_pages(page_id)
+    report = notion_writer.run(_archive_calls(loan_pages))
+    loan_index.apply([], [page["id"] for page, result in zip(loan_pages, report.results) if result.ok])
+    if not report.ok:
+        # 대출 항목이 남아 있는 채로 고객만 사라지지 않도록 고객 페이지는 보관하지 않습니다.
+        raise RuntimeError(f"대출 항목 보관 실패 ({report.summary()})")
+    notion.archive_page(page_id)
+    apply_customer_pages([{"id": page_id, "archived": True}])
+
+notion_outbox = NotionOutbox({"save": _flush_save, "delete": _flush_delete})
+notion_outbox.start()
+
+def _save_payload(customer_name, page_id=None):
+    df = st.session_state.get("loan_df")
+    if df is None:
+        df = empty_loan_df()
+    return {
+        "customer_name": customer_name,
+        "page_id": page_id,
+        "properties": get_properties_payload(),
+        "loans": [[loan_page_id, list(row)] for loan_page_id, row in loan_rows(df)],
+    }
+
+def get_sync_status(customer_name):
+    """고객의 Notion 반영 상태 (notion_outbox.status 참고)"""
+    return notion_outbox.status(customer_name)
+
+def get_unsynced_customers():
+    return notion_outbox.unsynced()
+
+def retry_sync(customer_name):
+    notion_outbox.retry(customer_name)
 
 def create_new_customer():
     customer_name = st.session_state.get("customer_name", "").strip()
@@ -203,18 +385,11 @@ def create_new_customer():
         st.error("고객명이 입력되지 않았습니다.")
         return
     try:
-        if st.session_state.get("notion_customers", {}).get(customer_name):
+        if get_customers().get(customer_name):
             st.warning(f"'{customer_name}' 이름의 고객이 이미 존재합니다. 다른 이름으로 저장하거나, '수정' 버튼을 이용해주세요.")
             return
-        properties = get_properties_payload()
-        payload = {"parent": {"database_id": NOTION_DB_ID}, "properties": properties}
-        res = requests.post("https://api.notion.com/v1/pages", headers=NOTION_HEADERS, json=payload)
-        res.raise_for_status()
-        new_page_id = res.json().get("id")
-        if new_page_id:
-            save_loan_items(new_page_id)
-        fetch_all_notion_customers()
-        st.success(f"✅ '{customer_name}' 고객 정보가 Notion에 새로 저장되었습니다.")
+        notion_outbox.enqueue("save", customer_name, _save_payload(customer_name))
+        st.success(f"✅ '{customer_name}' 고객 정보 저장을 요청했습니다. Notion에는 잠시 후 반영됩니다.")
     except Exception as e:
         st.error(f"❌ 신규 저장 실패: {e}")
 
@@ -223,39 +398,24 @@ def update_existing_customer():
     if not customer_name:
         st.error("고객명이 입력되지 않았습니다.")
         return
-    existing_customer_data = st.session_state.get("notion_customers", {}).get(customer_name)
+    existing_customer_data = get_customers().get(customer_name)
     if not existing_customer_data:
         st.warning(f"'{customer_name}' 이름의 기존 고객을 찾을 수 없습니다. 신규 저장을 이용해주세요.")
         return
-    page_id = existing_customer_data.get("notion_page_id")
     try:
-        properties = get_properties_payload()
-        update_url = f"https://api.notion.com/v1/pages/{page_id}"
-        res = requests.patch(update_url, headers=NOTION_HEADERS, json={"properties": properties})
-        res.raise_for_status()
-        save_loan_items(page_id)
-        fetch_all_notion_customers()
-        st.success(f"✅ '{customer_name}' 고객 정보가 성공적으로 수정되었습니다.")
+        notion_outbox.enqueue("save", customer_name, _save_payload(customer_name, existing_customer_data.get("notion_page_id")))
+        st.success(f"✅ '{customer_name}' 고객 정보 수정을 요청했습니다. Notion에는 잠시 후 반영됩니다.")
     except Exception as e:
         st.error(f"❌ 수정 실패: {e}")
 
 def delete_customer_from_notion(customer_name):
-    customer_data = st.session_state.get("notion_customers", {}).get(customer_name)
+    customer_data = get_customers().get(customer_name)
     if not customer_data or "notion_page_id" not in customer_data:
         st.error("삭제할 고객을 찾을 수 없습니다.")
         return
-    page_id = customer_data["notion_page_id"]
     try:
-        loan_query_url = f"https://api.notion.com/v1/databases/{NOTION_DB_ID_LOAN}/query"
-        payload = {"filter": {"property": LOAN_DB_RELATION_PROPERTY_NAME, "relation": {"contains": page_id}}}
-        res = requests.post(loan_query_url, headers=NOTION_HEADERS, json=payload)
-        res.raise_for_status()
-        for page in res.json().get("results", []):
-            archive_url = f"https://api.notion.com/v1/pages/{page['id']}"
-            requests.patch(archive_url, headers=NOTION_HEADERS, json={"archived": True})
-        customer_archive_url = f"https://api.notion.com/v1/pages/{page_id}"
-        requests.patch(customer_archive_url, headers=NOTION_HEADERS, json={"archived": True})
-        fetch_all_notion_customers()
-        st.success(f"✅ '{customer_name}' 고객 및 관련 대출 항목이 모두 삭제(보관)되었습니다.")
+        payload = {"customer_name": customer_name, "page_id": customer_data["notion_page_id"]}
+        notion_outbox.enqueue("delete", customer_name, payload, coalesce=False)
+        st.success(f"✅ '{customer_name}' 고객 및 관련 대출 항목 삭제(보관)를 요청했습니다.")
     except Exception as e:
         st.error(f"❌ 고객 삭제 실패: {e}")
@@ -0,0 +1,133 @@
+import time
+import threading
+
+# ─────────────────────────────
+# 🏦 대출 항목 일괄 색인 (고객 page_id 기준)
+# ─────────────────────────────
+class LoanIndex:
+    """대출 DB 전체를 한 번에 받아 고객별로 묶어 두는 프로세스 공유 색인.
+
+    loader(watermark) 는 watermark 이후 수정된 대출 페이지를 (None 이면 전체를) 돌려줘야 합니다.
+    TTL 이 지나면 증분 조회로 갱신하고, full_resync 주기마다 전체를 다시 받습니다.
+    """
+
+    def __init__(self, loader, relation_property, ttl, full_resync):
+        self.loader = loader
+        self.relation_property = relation_property
+        self.ttl = ttl
+        self.full_resync = full_resync
+        self._pages = None          # 대출 page_id → 페이지
+        self._owners = {}           # 고객 page_id → [대출 page_id, ...] (조회 순서 유지)
+        self._watermark = None
+        self._loaded_at = 0.0
+        self._full_at = 0.0
+        self._lock = threading.Lock()
+        self._warming = False
+
+    # --- 조회 ---
+    def _is_stale(self):
+        return self._pages is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_fresh(self):
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    try:
+                        self._refresh()
+                    except Exception:
+                        # 이미 받아 둔 색인이 있으면 잠시 오래된 값을 쓰고, 처음이면 오류를 알립니다.
+                        if self._pages is None:
+                            raise
+
+    def get(self, customer_page_id):
+        """해당 고객의 대출 페이지 목록. 색인이 오래되었으면 먼저 갱신합니다."""
+        self._ensure_fresh()
+        with self._lock:
+            return [self._pages[page_id] for page_id in self._owners.get(customer_page_id, [])]
+
+    def all_by_customer(self):
+        """{고객 page_id: [대출 페이지, ...]} 전체 (포트폴리오 일괄 계산용)"""
+        self._ensure_fresh()
+        with self._lock:
+            return {owner: [self._pages[page_id] for page_id in ids] for owner, ids in self._owners.items() if ids}
+
+    def warm(self):
+        """색인이 오래되었으면 백그라운드에서 미리 갱신합니다 (고객 전환 시 대기 없음)."""
+        if not self._is_stale() or self._warming:
+            return
+        self._warming = True
+
+        def run():
+            try:
+                with self._lock:
+                    if self._is_stale():
+                        self._refresh()
+            except Exception:
+                pass
+            finally:
+                self._warming = False
+
+        threading.Thread(target=run, name="loan-index-warm", daemon=True).start()
+
+    def refresh(self, full=False):
+        """TTL 과 상관없이 지금 갱신합니다 (full=True 이면 전체를 다시 받습니다)."""
+        with self._lock:
+            if full:
+                self._full_at = 0.0
+            self._refresh()
+
+    def _refresh(self):
+        now = time.monotonic()
+        full = self._pages is None or self._watermark is None or now - self._full_at > self.full_resync
+        pages = self.loader(None if full else self._watermark)
+        if full:
+            self._pages, self._owners = {}, {}
+            self._full_at = now
+        self._apply(pages, ())
+        # 워터마크는 조회 결과로만 올립니다. 저장 응답으로 올리면 그보다 먼저 다른 세션에서
+        # 수정된 대출 항목을 증분 조회가 건너뜁니다.
+        edited = [page["last_edited_time"] for page in pages if page.get("last_edited_time")]
+        if edited and (self._watermark is None or max(edited) > self._watermark):
+            self._watermark = max(edited)
+        self._loaded_at = now
+
+    # --- 변경 반영 ---
+    def _customer_of(self, page):
+        relation = page.get("properties", {}).get(self.relation_property, {}).get("relation") or []
+        return relation[0]["id"] if relation else None
+
+    def _apply(self, pages, removals):
+        for page in pages:
+            if page.get("archived") or page.get("in_trash"):
+                removals = list(removals) + [page["id"]]
+                continue
+            old = self._pages.get(page["id"])
+            old_owner = self._customer_of(old) if old else None
+            owner = self._customer_of(page)
+            if old_owner and old_owner != owner and page["id"] in self._owners.get(old_owner, []):
+                self._owners[old_owner].remove(page["id"])
+            self._pages[page["id"]] = page
+            if owner and page["id"] not in self._owners.setdefault(owner, []):
+                self._owners[owner].append(page["id"])
+        for page_id in removals:
+            old = self._pages.pop(page_id, None)
+            owner = self._customer_of(old) if old else None
+            if owner and page_id in self._owners.get(owner, []):
+                self._owners[owner].remove(page_id)
+
+    def apply(self, pages, removals=()):
+        """저장/보관 응답을 바로 반영합니다. 아직 색인을 받기 전이면 무시합니다."""
+        with self._lock:
+            if self._pages is not None:
+                self._apply(pages, removals)
+
+    def replace(self, customer_page_id, pages):
+        """한 고객의 대출 항목을 방금 조회한 pages 로 바꿉니다 (pages 에 없는 기존 항목은 지웁니다).
+
+        저장 직전에 다시 조회한 결과를 반영하는 용도이므로 워터마크는 옮기지 않습니다.
+        """
+        with self._lock:
+            if self._pages is not None:
+                current = {page["id"] for page in pages}
+                stale = [page_id for page_id in self._owners.get(customer_page_id, []) if page_id not in current]
+                self._apply(pages, stale)
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from ltv_engine import LOAN_STATUSES, LoanSums, principal_from_max
+
+# ─────────────────────────────
+# 📋 대출 항목 표 (열 단위 계산)
+# ─────────────────────────────
+# 대출 항목을 행마다 위젯/세션 키로 두지 않고 DataFrame 하나로 다룹니다.
+# 금액/비율 열은 정수로 보관하므로 매 실행마다 문자열을 다시 해석하지 않습니다.
+LOAN_COLUMNS = ["설정자", "채권최고액", "설정비율", "원금", "진행구분"]
+NUMBER_COLUMNS = ["채권최고액", "설정비율", "원금"]
+PAGE_ID = "page_id"     # Notion 대출 페이지 ID (화면에는 숨김, 새 항목은 빈 값)
+# 등기부에는 채권최고액만 있으므로 원금은 이 설정비율로 추정합니다 (은행권 통상 120%).
+DEFAULT_LIEN_RATIO = 120
+
+def empty_loan_df(rows=1):
+    return normalize_loan_df(pd.DataFrame({col: [None] * rows for col in LOAN_COLUMNS + [PAGE_ID]}))
+
+def loan_df_from_rows(rows, page_ids=None):
+    """[(설정자, 채권최고액, 설정비율, 원금, 진행구분), ...] → 대출 표"""
+    df = pd.DataFrame(list(rows), columns=LOAN_COLUMNS)
+    df[PAGE_ID] = list(page_ids) if page_ids is not None else ""
+    return normalize_loan_df(df) if len(df) else empty_loan_df()
+
+def lien_loan_rows(liens, ratio=DEFAULT_LIEN_RATIO):
+    """등기부 근저당권 [(순위, 근저당권자, 채권최고액), ...] → 대출 표 행 (진행구분은 유지)"""
+    return [(lender, max_amount, ratio, principal_from_max(max_amount, ratio), LOAN_STATUSES[0])
+            for _, lender, max_amount in liens]
+
+def normalize_loan_df(df):
+    """편집기에서 돌아온 표의 빈 칸과 자료형을 정리합니다 (행 인덱스는 그대로 둡니다)."""
+    df = df.copy()
+    for col in LOAN_COLUMNS + [PAGE_ID]:
+        if col not in df:
+            df[col] = None
+    df["설정자"] = df["설정자"].fillna("").astype(str)
+    for col in NUMBER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).clip(lower=0).astype("int64")
+    df["진행구분"] = df["진행구분"].where(df["진행구분"].isin(LOAN_STATUSES), LOAN_STATUSES[0])
+    df[PAGE_ID] = df[PAGE_ID].fillna("").astype(str)
+    if not pd.api.types.is_integer_dtype(df.index.dtype):
+        df = df.reset_index(drop=True)
+    return df[LOAN_COLUMNS + [PAGE_ID]]
+
+# ------------------------------
+# 🔹 채권최고액 ↔ 원금 자동 계산 (열 단위)
+# ------------------------------
+def reconcile_loan_df(df, prev):
+    """직전 실행의 표(prev)와 행 인덱스로 맞춰 비교하고 바뀐 칸을 기준으로 나머지 칸을 열 단위로 다시 계산합니다.
+
+    반환: (다시 계산한 표, 바뀐 칸이 있는지)
+    """
+    before = prev.reindex(df.index)[NUMBER_COLUMNS].fillna(0).astype("int64")
+    max_val, rat_val, pri_val = (df[col].to_numpy() for col in NUMBER_COLUMNS)
+    pri_changed = pri_val != before["원금"].to_numpy()
+    # 규칙 1: 원금이 바뀌었으면 (최우선) 채권최고액을 다시 계산
+    rule1 = pri_changed & (rat_val > 0)
+    # 규칙 2: 원금은 그대로이고 채권최고액이나 비율이 바뀌었으면 원금을 다시 계산
+    rule2 = (~pri_changed
+             & ((max_val != before["채권최고액"].to_numpy()) | (rat_val != before["설정비율"].to_numpy()))
+             & (max_val > 0) & (rat_val > 0))
+    if not (rule1.any() or rule2.any()):
+        return df, False
+
+    safe_rat = np.where(rat_val > 0, rat_val, 1)
+    new_max = np.where(rule1, np.trunc(pri_val * rat_val / 100), max_val).astype("int64")
+    new_pri = np.where(rule2, np.trunc(max_val * 100 / safe_rat), pri_val).astype("int64")
+    changed = bool((new_max != max_val).any() or (new_pri != pri_val).any())
+    out = df.copy()
+    out["채권최고액"], out["원금"] = new_max, new_pri
+    return out, changed
+
+# ------------------------------
+# 🔹 합계 / 유효 항목
+# ------------------------------
+def loan_sums_df(df):
+    status = df["진행구분"]
+    principal = df["원금"]
+    return LoanSums(
+        int(principal[status == "대환"].sum()),
+        int(principal[status == "선말소"].sum()),
+        int(df["채권최고액"][status == "유지"].sum()),
+        int(principal[status != "유지"].sum()),
+    )
+
+def valid_loan_mask(df):
+    """설정자, 채권최고액, 원금 중 하나라도 입력된 행"""
+    return (df["설정자"].str.strip() != "") | (df["채권최고액"] != 0) | (df["원금"] != 0)
+
+def loan_items(df):
+    """메모/저장용 dict 목록 (유효한 행만)"""
+    return df.loc[valid_loan_mask(df), LOAN_COLUMNS].to_dict("records")
+
+def loan_rows(df, named_only=True):
+    """Notion 저장용 [(page_id, (설정자, 채권최고액, 설정비율, 원금, 진행구분)), ...] (기본은 설정자가 있는 행만)"""
+    named = df[df["설정자"].str.strip() != ""] if named_only else df
+    return [
+        (page_id or None, (lender.strip(), int(max_amt), int(ratio), int(principal), status))
+        for lender, max_amt, ratio, principal, status, page_id in named[LOAN_COLUMNS + [PAGE_ID]].itertuples(index=False)
+    ]
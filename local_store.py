@@ -0,0 +1,15 @@
+import os
+import sqlite3
+
+# ─────────────────────────────
+# 💽 로컬 저장소 공통 설정
+# ─────────────────────────────
+# 추출 결과 등 앱이 로컬에 보관하는 파일의 위치 (환경변수로 변경 가능)
+CACHE_DIR = os.environ.get("LTV_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+def connect(filename):
+    """CACHE_DIR 아래의 SQLite 파일에 연결합니다. 호출한 쪽에서 닫아야 합니다."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, filename), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
@@ -0,0 +1,156 @@
+import re
+from collections import namedtuple
+
+# ─────────────────────────────
+# 🧮 LTV 계산 엔진 (Streamlit 없이 가져다 쓸 수 있는 순수 함수)
+# ─────────────────────────────
+# 금액 단위는 모두 만원입니다. app.py, history_manager.py, bench_ltv_engine.py 가 함께 씁니다.
+LOAN_STATUSES = ("유지", "대환", "선말소")
+
+# 진행구분별 합계: 대환/선말소 원금, 유지 채권최고액, 유지 외 원금
+LoanSums = namedtuple("LoanSums", ["dh", "sm", "maintain", "sub_principal"])
+# limit_senior / limit_sub: {LTV: (한도, 가용)}
+LtvResult = namedtuple("LtvResult", ["limit_senior", "limit_sub", "valid_items", "sums"])
+Fees = namedtuple("Fees", ["consult_amount", "consult_fee", "bridge_amount", "bridge_fee", "total"])
+
+# ------------------------------
+# 🔹 숫자 입력 해석
+# ------------------------------
+def parse_comma_number(text):
+    try: return int(re.sub(r"[^\d]", "", str(text)))
+    except: return 0
+
+_EOK_RE = re.compile(r"(\d+)\s*억")
+_CHEONMAN_RE = re.compile(r"(\d+)\s*천만")
+_MAN_RE = re.compile(r"(\d+)\s*만")
+
+def parse_korean_number(text: str) -> int:
+    """"5억 3천만", "12,500" 같은 입력을 만원 단위 정수로 바꿉니다."""
+    txt = str(text).replace(",", "").strip()
+    total = 0
+    m = _EOK_RE.search(txt)
+    if m:
+        total += int(m.group(1)) * 10000
+    m = _CHEONMAN_RE.search(txt)
+    if m:
+        total += int(m.group(1)) * 1000
+    m = _MAN_RE.search(txt)
+    if m:
+        total += int(m.group(1))
+    if total == 0:
+        try:
+            total = int(txt)
+        except:
+            total = 0
+    return total
+
+# ------------------------------
+# 🔹 채권최고액 ↔ 설정비율 ↔ 원금
+# ------------------------------
+def principal_from_max(max_amt, ratio):
+    return int(max_amt * 100 / ratio)
+
+# ------------------------------
+# 🔹 한도 / 가용 계산
+# ------------------------------
+def loan_sums(items):
+    """items: [{"설정자", "채권최고액", "설정비율", "원금", "진행구분"}, ...]"""
+    dh = sm = maintain = sub_principal = 0
+    for item in items:
+        status = item.get("진행구분")
+        principal = parse_comma_number(item.get("원금", "0"))
+        if status == "대환":
+            dh += principal
+        elif status == "선말소":
+            sm += principal
+        if status == "유지":
+            maintain += parse_comma_number(item.get("채권최고액", "0"))
+        else:
+            sub_principal += principal
+    return LoanSums(dh, sm, maintain, sub_principal)
+
+def is_valid_item(item):
+    """설정자, 채권최고액, 원금 중 하나라도 입력된 항목인지"""
+    return any([
+        item.get("설정자", "").strip(),
+        re.sub(r"[^\d]", "", str(item.get("채권최고액", "") or "0")) != "0",
+        re.sub(r"[^\d]", "", str(item.get("원금", "") or "0")) != "0",
+    ])
+
+def calculate_ltv(total_value, deduction, principal_sum, maintain_maxamt_sum, ltv, is_senior=True):
+    """(한도, 가용) — 둘 다 10만 단위 내림"""
+    if is_senior:
+        limit = int(total_value * (ltv / 100) - deduction)
+        available = int(limit - principal_sum)
+    else:
+        limit = int(total_value * (ltv / 100) - maintain_maxamt_sum - deduction)
+        available = int(limit - principal_sum)
+    limit = (limit // 10) * 10
+    available = (available // 10) * 10
+    return limit, available
+
+def evaluate_case(total_value, deduction, items, ltv_selected):
+    """한 건의 LTV 결과. 유지 채권최고액이 있으면 후순위, 없으면 선순위로 계산합니다."""
+    limit_senior, limit_sub = {}, {}
+    if not items:
+        for ltv in ltv_selected:
+            limit = int(total_value * (ltv / 100) - deduction)
+            limit = (limit // 10) * 10
+            limit_senior[ltv] = (limit, limit)
+        return LtvResult(limit_senior, limit_sub, [], LoanSums(0, 0, 0, 0))
+
+    return evaluate_sums(total_value, deduction, loan_sums(items), ltv_selected, [item for item in items if is_valid_item(item)])
+
+def evaluate_sums(total_value, deduction, sums, ltv_selected, valid_items=()):
+    """진행구분별 합계(LoanSums)가 이미 있을 때의 LTV 결과 (대출 표처럼 열 단위로 합계를 낸 경우)"""
+    limit_senior, limit_sub = {}, {}
+    for ltv in ltv_selected:
+        if sums.maintain > 0:
+            limit_sub[ltv] = calculate_ltv(total_value, deduction, sums.sub_principal, sums.maintain, ltv, is_senior=False)
+        else:
+            limit_senior[ltv] = calculate_ltv(total_value, deduction, sums.dh + sums.sm, 0, ltv, is_senior=True)
+    return LtvResult(limit_senior, limit_sub, list(valid_items), sums)
+
+def calculate_fees(consult_amount, consult_rate, bridge_amount, bridge_rate):
+    consult_fee = int(consult_amount * consult_rate / 100)
+    bridge_fee = int(bridge_amount * bridge_rate / 100)
+    return Fees(consult_amount, consult_fee, bridge_amount, bridge_fee, consult_fee + bridge_fee)
+
+# ------------------------------
+# 🔹 결과 메모
+# ------------------------------
+def price_type(floor_num):
+    return "하안가" if floor_num and floor_num <= 2 else "일반가"
+
+def build_memo(customer_name, address, area, raw_price_input, floor_num, deduction, result, ltv_selected, fees):
+    """복사용 결과 메모 문자열을 만듭니다."""
+    clean_price = parse_korean_number(raw_price_input)
+    formatted_price = "{:,}".format(clean_price) if clean_price else raw_price_input
+    text = f"고객명 : {customer_name}\n주소 : {address}\n"
+    text += f"{price_type(floor_num)} | KB시세: {formatted_price} | 전용면적 : {area} | 방공제 금액 : {deduction:,}만\n"
+    if result.valid_items:
+        text += "\n[대출 항목]\n"
+        for item in result.valid_items:
+            max_amt = parse_comma_number(item.get("채권최고액", "0"))
+            principal_amt = parse_comma_number(item.get("원금", "0"))
+            text += f"{item.get('설정자', '')} | 채권최고액: {max_amt:,} | 원금: {principal_amt:,} | {item.get('진행구분', '')}\n"
+
+    for ltv in ltv_selected:
+        if ltv in result.limit_senior:
+            limit, avail = result.limit_senior[ltv]
+            text += f"\n[선순위 LTV {ltv}%] 한도: {limit:,}만 | 가용: {avail:,}만"
+        if ltv in result.limit_sub:
+            limit, avail = result.limit_sub[ltv]
+            text += f"\n[후순위 LTV {ltv}%] 한도: {limit:,}만 | 가용: {avail:,}만"
+
+    text += "\n[진행구분별 원금 합계]\n"
+    if result.sums.dh > 0: text += f"대환: {result.sums.dh:,}만\n"
+    if result.sums.sm > 0: text += f"선말소: {result.sums.sm:,}만\n"
+
+    text += f"""
+[수수료 정보]
+컨설팅: {fees.consult_amount:,}만 (수수료: {fees.consult_fee:,}만)
+브릿지: {fees.bridge_amount:,}만 (수수료: {fees.bridge_fee:,}만)
+총 합계: {fees.total:,}만
+"""
+    return text
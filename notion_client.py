@@ -0,0 +1,142 @@
+import os
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import perf_metrics
+
+# ─────────────────────────────
+# 🌐 Notion API 클라이언트 설정
+# ─────────────────────────────
+NOTION_API_BASE = os.environ.get("NOTION_API_BASE", "https://api.notion.com/v1")
+NOTION_VERSION = "2022-06-28"
+# (연결, 응답) 제한 시간 (초)
+CONNECT_TIMEOUT = float(os.environ.get("LTV_NOTION_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("LTV_NOTION_READ_TIMEOUT", "30"))
+POOL_SIZE = 10
+# Notion API 평균 허용량은 통합(integration)당 초당 약 3회입니다.
+NOTION_RATE_PER_SEC = 3.0
+NOTION_BURST = 3
+MAX_RETRIES = 4
+
+# ------------------------------
+# 🔹 토큰 버킷
+# ------------------------------
+class TokenBucket:
+    """초당 rate 개의 토큰이 채워지는 버킷. acquire()는 토큰이 생길 때까지 기다립니다."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """429 응답을 받으면 모든 요청이 함께 쉬도록 버킷을 비웁니다."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+# 프로세스 안의 모든 세션이 같은 한도를 나눠 씁니다.
+notion_rate_limiter = TokenBucket(NOTION_RATE_PER_SEC, NOTION_BURST)
+
+# ------------------------------
+# 🔹 클라이언트
+# ------------------------------
+class NotionClient:
+    """연결을 재사용하는 Notion API 클라이언트 (제한 시간, 요청 한도, 재시도, 지연 시간 기록 포함)"""
+
+    def __init__(self, token, base_url=NOTION_API_BASE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 pool_size=POOL_SIZE, limiter=notion_rate_limiter, max_retries=MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION,
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # --- 저수준 요청 ---
+    def request(self, method, path, payload=None, name=None):
+        """요청을 보내고 최종 응답을 반환합니다. 429/5xx/네트워크 오류는 지수 백오프로 재시도합니다.
+
+        재시도 후에도 네트워크 오류이면 마지막 예외를 그대로 올립니다.
+        """
+        name = name or f"{method} {path.split('/')[0]}"
+        url = f"{self.base_url}/{path}"
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # 0.5초, 1초, 2초 ... 에 약간의 무작위 지연을 더해 재시도합니다.
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 8) + random.uniform(0, 0.25))
+            self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                res = self.session.request(method, url, json=payload, timeout=self.timeout)
+            except requests.RequestException:
+                self._record(name, time.perf_counter() - started)
+                if attempt == self.max_retries:
+                    raise
+                continue
+            self._record(name, time.perf_counter() - started)
+            if res.status_code == 429:
+                self.limiter.pause(float(res.headers.get("Retry-After", 1) or 1))
+            elif res.status_code < 500:
+                return res
+        return res
+
+    def _call(self, method, path, payload=None, name=None):
+        res = self.request(method, path, payload, name)
+        res.raise_for_status()
+        return res.json()
+
+    # --- 데이터베이스 / 페이지 ---
+    def query_database(self, database_id, filter=None, page_size=100):
+        """조건에 맞는 페이지를 커서를 따라가며 모두 돌려줍니다."""
+        has_more = True; next_cursor = None
+        while has_more:
+            payload = {"page_size": page_size}
+            if filter: payload["filter"] = filter
+            if next_cursor: payload["start_cursor"] = next_cursor
+            data = self._call("POST", f"databases/{database_id}/query", payload, name="POST databases/query")
+            yield from data.get("results", [])
+            has_more = data.get("has_more", False)
+            next_cursor = data.get("next_cursor")
+
+    def create_page(self, payload):
+        return self._call("POST", "pages", payload, name="POST pages")
+
+    def update_page(self, page_id, payload):
+        return self._call("PATCH", f"pages/{page_id}", payload, name="PATCH pages")
+
+    def archive_page(self, page_id):
+        return self.update_page(page_id, {"archived": True})
+
+    # --- 지연 시간 통계 ---
+    # 호출 종류별 지연 시간은 perf_metrics 에 "notion:<호출 종류>" 구간으로 기록되어
+    # 화면의 실행 내역과 Prometheus/JSON 내보내기에 함께 잡힙니다.
+    def _record(self, name, seconds):
+        perf_metrics.record(f"notion:{name}", seconds)
+
+    def latency_summary(self):
+        """{호출 종류: {"count", "avg_ms", "p50_ms", "p95_ms", "max_ms"}} (최근 perf_metrics.WINDOW 건 기준)"""
+        return perf_metrics.summary(prefix="notion:")
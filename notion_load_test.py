@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_ltv_engine import synthetic_portfolio
+from ltv_engine import parse_korean_number
+from notion_stub_server import NotionStubServer
+
+# ─────────────────────────────
+# 🏋️ Notion 조회/저장 부하 시험
+# ─────────────────────────────
+# 로컬 Notion 대역 서버(notion_stub_server)를 띄워 가상 고객/대출을 채우고,
+# history_manager 의 조회(fetch) / 불러오기(load) / 저장(save) / 삭제(delete) 경로를 그대로 돌려
+# 단계별 처리량과 지연 시간 분위수를 보고합니다. 실제 워크스페이스와 로컬 캐시는 건드리지 않습니다.
+#
+# 사용법:
+#   python notion_load_test.py --customers 5000                       # 서버 한도 없음
+#   python notion_load_test.py --rate 3 --latency-ms 80 --jitter-ms 40  # 실제 Notion에 가까운 조건 (429 포함)
+#   python notion_load_test.py --json load.json
+#   python notion_load_test.py --serve --customers 5000               # 채운 서버를 띄워 두고 앱을 직접 연결
+
+# ------------------------------
+# 🔹 가상 데이터
+# ------------------------------
+def _number(text):
+    return int(str(text).replace(",", "") or 0)
+
+def customer_properties(name, data):
+    return {
+        "고객명": {"title": [{"text": {"content": name}}]},
+        "주소": {"rich_text": [{"text": {"content": f"{data['region']} 가상로 1"}}]},
+        "방공제 지역": {"rich_text": [{"text": {"content": data["region"]}}]},
+        "KB시세": {"number": parse_korean_number(data["raw_price_input"])},
+    }
+
+def seed(stub, hm, n, seed=0, max_loans=3):
+    """가상 포트폴리오를 대역 서버 저장소에 바로 채웁니다. 고객명 목록을 반환합니다."""
+    customers, loans, _ = synthetic_portfolio(n, seed, max_loans)
+    for name, data in customers.items():
+        page = stub.add_page(hm.NOTION_DB_ID, customer_properties(name, data))
+        for row in loans[data["notion_page_id"]]:
+            lender, max_amt, ratio, principal, status = row
+            stub.add_page(hm.NOTION_DB_ID_LOAN, hm._loan_properties(
+                (lender, _number(max_amt), _number(ratio), _number(principal), status), page["id"]))
+    return list(customers)
+
+def random_loans(rng, max_loans=3):
+    rows = []
+    for _ in range(rng.randint(0, max_loans)):
+        ratio = rng.choice([110, 120, 130])
+        principal = rng.randrange(500, 30000, 100)
+        rows.append([None, [f"은행{rng.randint(1, 30)}", principal * ratio // 100, ratio, principal, "유지"]])
+    return rows
+
+# ------------------------------
+# 🔹 측정
+# ------------------------------
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def run_phase(fn, items, workers=1):
+    """items 마다 fn(item) 을 workers 개 스레드로 실행하고 처리량/지연 시간을 돌려줍니다."""
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            fn(item)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(timed, items))
+    seconds = time.perf_counter() - started
+    timings = [t for t, _ in results]
+    if not timings:
+        return {"ops": 0, "errors": 0, "seconds": 0.0, "ops_per_sec": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "ops": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "seconds": round(seconds, 3),
+        "ops_per_sec": round(len(results) / seconds, 2),
+        "p50_ms": round(_percentile(timings, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(timings, 0.95) * 1000, 1),
+        "p99_ms": round(_percentile(timings, 0.99) * 1000, 1),
+    }
+
+def run(hm, names, args):
+    rng = random.Random(args.seed)
+    results = {}
+
+    # 조회: 고객 DB 전체 동기화 + 대출 색인 전체 갱신 (페이지 나누기 포함), 이후는 증분 동기화
+    def fetch(i):
+        hm.fetch_all_notion_customers()
+        hm.loan_index.refresh(full=i == 0)
+    results["fetch(full)"] = run_phase(fetch, [0])
+    results["fetch(incremental)"] = run_phase(fetch, range(1, args.fetches + 1))
+
+    # 불러오기: 화면의 "불러오기" 버튼 (세션 상태가 하나뿐이므로 순서대로)
+    results["load"] = run_phase(hm.load_customer_input, rng.sample(names, min(args.loads, len(names))))
+
+    # 저장: 출력 대기열 워커가 실행하는 핸들러를 직접 호출 (신규 고객 생성 + 기존 고객 수정)
+    customers = hm.get_customers()
+    def save(item):
+        name, page_id = item
+        payload = {"customer_name": name, "page_id": page_id, "properties": customer_properties(name, {"region": "서울", "raw_price_input": f"{rng.randrange(10000, 300000, 500):,}"}),
+                   "loans": random_loans(rng, args.max_loans)}
+        hm._flush_save(payload, lambda updated: None)
+    creates = [(f"부하시험{i}", None) for i in range(args.saves // 2)]
+    updates = [(name, customers[name]["notion_page_id"]) for name in rng.sample(names, min(args.saves - len(creates), len(names)))]
+    results["save(create)"] = run_phase(save, creates, args.workers)
+    results["save(update)"] = run_phase(save, updates, args.workers)
+
+    # 삭제: 고객 + 대출 항목 보관
+    targets = rng.sample(names, min(args.deletes, len(names)))
+    results["delete"] = run_phase(lambda name: hm._flush_delete({"customer_name": name, "page_id": customers[name]["notion_page_id"]}, None),
+                                  targets, args.workers)
+    return results
+
+def print_report(results, server, calls):
+    print(f"{'단계':>20} | {'건수':>6} | {'오류':>4} | {'건/초':>8} | {'p50':>9} | {'p95':>9} | {'p99':>9}")
+    for phase, r in results.items():
+        print(f"{phase:>20} | {r['ops']:>6,} | {r['errors']:>4} | {r['ops_per_sec']:>8,.2f} | "
+              f"{r['p50_ms']:>7.1f}ms | {r['p95_ms']:>7.1f}ms | {r['p99_ms']:>7.1f}ms")
+    print()
+    print("서버 응답 (엔드포인트, 상태: 건수):")
+    for (endpoint, status), count in sorted(server.stats.items()):
+        print(f"  {endpoint:<24} {status}: {count:,}")
+    print("클라이언트 호출 지연 (최근 기준):")
+    for name, s in sorted(calls.items()):
+        print(f"  {name:<24} {s['count']:>5,}건  p50 {s['p50_ms']:.1f}ms  p95 {s['p95_ms']:.1f}ms  max {s['max_ms']:.1f}ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 Notion 대역 서버로 history_manager 조회/저장 부하 시험")
+    parser.add_argument("--customers", type=int, default=5000, help="채워 둘 가상 고객 수")
+    parser.add_argument("--max-loans", type=int, default=3, help="고객당 최대 대출 항목 수")
+    parser.add_argument("--fetches", type=int, default=5, help="증분 조회 횟수")
+    parser.add_argument("--loads", type=int, default=200, help="불러오기 횟수")
+    parser.add_argument("--saves", type=int, default=100, help="저장 횟수 (절반 신규, 절반 수정)")
+    parser.add_argument("--deletes", type=int, default=50, help="삭제 횟수")
+    parser.add_argument("--workers", type=int, default=4, help="저장/삭제를 동시에 실행할 스레드 수 (세션 수)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="서버 응답 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="서버 응답 지연의 무작위 범위 (ms)")
+    parser.add_argument("--rate", type=float, default=0, help="서버 초당 허용 요청 수 (0이면 무제한, 넘으면 429)")
+    parser.add_argument("--burst", type=int, help="서버가 한 번에 허용할 요청 수 (기본: rate)")
+    parser.add_argument("--error-rate", type=float, default=0, help="서버 무작위 503 비율 (0~1)")
+    parser.add_argument("--client-rate", type=float, default=0,
+                        help="클라이언트 초당 요청 한도 (기본: notion_client 설정값, 서버 429 처리를 보려면 서버 --rate 보다 크게)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--serve", action="store_true", help="시험 대신 채운 서버를 띄워 두기 (Ctrl+C 로 종료)")
+    parser.add_argument("--port", type=int, help="서버 포트 (기본: --serve 이면 8765, 아니면 빈 포트)")
+    args = parser.parse_args(argv)
+
+    port = args.port if args.port is not None else (8765 if args.serve else 0)
+    server = NotionStubServer(("127.0.0.1", port),
+                              latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                              rate=args.rate, burst=args.burst, error_rate=args.error_rate).start()
+    # history_manager 는 불러올 때 API 주소와 캐시 경로를 읽으므로 먼저 대역 서버와 임시 캐시로 돌려 둡니다.
+    os.environ["NOTION_API_BASE"] = server.base_url
+    os.environ["LTV_CACHE_DIR"] = tempfile.mkdtemp(prefix="ltv-load-")
+    import streamlit.logger
+    import history_manager as hm
+    import perf_metrics
+    streamlit.logger.set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    started = time.perf_counter()
+    names = seed(server.stub, hm, args.customers, args.seed, args.max_loans)
+    print(f"가상 고객 {len(names):,}명 / 대출 {server.stub.count(hm.NOTION_DB_ID_LOAN):,}건 준비 ({time.perf_counter() - started:.1f}s), "
+          f"NOTION_API_BASE={server.base_url}")
+    if args.serve:
+        print(f"NOTION_API_BASE={server.base_url} streamlit run app.py  (Ctrl+C 로 종료)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return 0
+
+    if args.client_rate:
+        hm.notion.limiter.rate = args.client_rate
+        hm.notion.limiter.capacity = max(1, int(args.client_rate))
+    results = run(hm, names, args)
+    print_report(results, server, perf_metrics.summary(prefix="notion:"))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "phases": results,
+                       "server": {f"{endpoint} {status}": count for (endpoint, status), count in sorted(server.stats.items())}},
+                      f, ensure_ascii=False, indent=2)
+    return 1 if any(r["errors"] for r in results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
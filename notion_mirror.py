@@ -0,0 +1,82 @@
+import json
+import time
+from contextlib import closing
+
+from local_store import connect
+
+# ─────────────────────────────
+# 🪞 Notion 고객 DB 로컬 미러
+# ─────────────────────────────
+class CustomerMirror:
+    """Notion 고객 DB를 로컬 SQLite에 보관하고, 마지막 동기화 시점(워터마크)을 기억합니다."""
+
+    def __init__(self, database_id):
+        self.filename = f"notion_mirror_{database_id.replace('-', '')}.sqlite3"
+
+    def _connect(self):
+        conn = connect(self.filename)
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS customers (
+                page_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                data TEXT NOT NULL,
+                last_edited TEXT NOT NULL
+            )"""
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def _get_meta(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def watermark(self):
+        """마지막으로 반영한 페이지의 last_edited_time (한 번도 동기화하지 않았으면 None)"""
+        return self._get_meta("watermark")
+
+    @property
+    def last_full_sync(self):
+        value = self._get_meta("last_full_sync")
+        return float(value) if value else 0.0
+
+    def apply(self, upserts, removals=(), full=False, from_query=False):
+        """변경분을 반영합니다. full=True 이면 upserts 에 없는 페이지는 모두 지웁니다.
+
+        upserts: [(page_id, 고객명, 데이터 dict, last_edited_time), ...]
+        removals: [page_id, ...]
+        from_query: Notion 조회 결과일 때만 True. 저장 응답으로 워터마크를 올리면
+                    그 사이에 다른 곳에서 수정된 페이지를 증분 동기화가 건너뛰게 됩니다.
+        """
+        with closing(self._connect()) as conn, conn:
+            if full:
+                conn.execute("DELETE FROM customers")
+            conn.executemany(
+                "INSERT OR REPLACE INTO customers VALUES (?, ?, ?, ?)",
+                [(page_id, name, json.dumps(data, ensure_ascii=False), edited) for page_id, name, data, edited in upserts],
+            )
+            conn.executemany("DELETE FROM customers WHERE page_id = ?", [(page_id,) for page_id in removals])
+
+            if full or from_query:
+                edited_times = [edited for _, _, _, edited in upserts if edited]
+                row = conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+                if row and not full:
+                    edited_times.append(row[0])
+                if edited_times:
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('watermark', ?)", (max(edited_times),))
+            if full:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_full_sync', ?)", (str(time.time()),))
+
+    def remove(self, page_id):
+        self.apply([], [page_id])
+
+    def load_all(self):
+        """{고객명: 데이터} 형태로 반환합니다 (최근 수정 순)."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name, data FROM customers ORDER BY last_edited DESC").fetchall()
+        customers = {}
+        for name, data in rows:
+            # 같은 이름이 여러 개면 가장 최근에 수정된 페이지를 사용합니다.
+            customers.setdefault(name, json.loads(data))
+        return customers
@@ -0,0 +1,223 @@
+import json
+import time
+import random
+import threading
+from contextlib import closing
+
+from local_store import connect
+
+# ─────────────────────────────
+# 📮 Notion 쓰기 대기열 (로컬 저널 + 백그라운드 전송)
+# ─────────────────────────────
+# 저장/삭제 요청을 먼저 로컬 SQLite 저널에 기록하고 바로 돌려줍니다.
+# 백그라운드 워커가 저널을 순서대로 Notion에 반영하고, 실패하면 간격을 늘려가며 다시 시도합니다.
+# 프로세스가 다시 시작되면 남아 있는 요청부터 이어서 보냅니다.
+#   - 같은 고객의 요청은 들어온 순서대로 하나씩 처리합니다 (다른 고객의 실패가 막지 않습니다).
+#     '실패'로 멈춘 요청이 있으면 그 고객의 뒤 요청도 다시 시도해 성공할 때까지 기다립니다.
+#   - 같은 고객의 아직 보내지 않은 저장 요청은 마지막 내용 하나로 합칩니다.
+DB_FILE = "notion_outbox.sqlite3"
+# 이 횟수만큼 실패하면 자동 재시도를 멈추고 '실패'로 표시합니다 (화면에서 다시 시도 가능).
+MAX_ATTEMPTS = 8
+MAX_BACKOFF = 300.0
+# 완료된 요청은 이 기간(초)만 남겨 둡니다 (동기화 상태 표시용).
+KEEP_DONE_SECONDS = 7 * 24 * 60 * 60
+
+PENDING, DONE, FAILED = "pending", "done", "failed"
+
+# 보낼 수 있는 요청: 대기 중이고, 같은 고객의 앞선 요청 중 대기/실패로 남은 것이 없음
+_READY = "o.status = ? AND NOT EXISTS (SELECT 1 FROM outbox p WHERE p.customer = o.customer AND p.status IN (?, ?) AND p.id < o.id)"
+
+def _backoff(attempts):
+    """2초, 4초, 8초 ... (최대 MAX_BACKOFF) 에 약간의 무작위 지연"""
+    return min(2.0 ** attempts, MAX_BACKOFF) + random.uniform(0, 1)
+
+# ------------------------------
+# 🔹 대기열
+# ------------------------------
+class NotionOutbox:
+    """handlers: {요청 종류: handler(payload, checkpoint)}
+
+    handler 는 실패하면 예외를 올립니다. 중간 진행 상황(예: 새로 만든 페이지 ID)은 checkpoint(payload) 로
+    저널에 남겨 두면, 다시 시도할 때 그 payload 로 이어서 처리합니다. 같은 요청이 두 번 실행되어도
+    결과가 같도록(멱등) 작성해야 합니다.
+    """
+
+    def __init__(self, handlers, db_file=DB_FILE):
+        self.handlers = handlers
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._in_flight = None
+        self._thread = None
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    customer TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT NOT NULL DEFAULT '',
+                    next_attempt REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, customer, id)")
+
+    def _connect(self):
+        return connect(self.db_file)
+
+    # --- 요청 기록 ---
+    def enqueue(self, kind, customer, payload, coalesce=True):
+        """요청을 저널에 기록하고 요청 ID를 반환합니다.
+
+        coalesce=True 이면 같은 고객·종류의 아직 끝나지 않은(대기/실패) 마지막 요청을 새 payload 로 바꿉니다.
+        실패로 멈춘 요청에 합치면 그 요청을 다시 대기열에 올립니다.
+        (이미 진행된 중간 결과는 merge_checkpoint 로 새 payload 에 옮깁니다)
+        합치지 않은 요청은 새로 기록되어, 같은 고객의 앞선 대기/실패 요청이 끝난 뒤에 보내집니다.
+        """
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = None
+            if coalesce:
+                row = conn.execute(
+                    "SELECT id, payload FROM outbox WHERE customer = ? AND kind = ? AND status IN (?, ?) ORDER BY id DESC LIMIT 1",
+                    (customer, kind, PENDING, FAILED),
+                ).fetchone()
+                # 워커가 지금 보내고 있는 요청이거나, 뒤에 다른 종류의 요청이 이미 있으면 합치지 않습니다.
+                if row and (row[0] == self._in_flight or conn.execute(
+                        "SELECT 1 FROM outbox WHERE customer = ? AND status IN (?, ?) AND id > ?",
+                        (customer, PENDING, FAILED, row[0])).fetchone()):
+                    row = None
+            if row:
+                merged = merge_checkpoint(json.loads(row[1]), payload)
+                conn.execute(
+                    "UPDATE outbox SET payload = ?, status = ?, attempts = 0, last_error = '', next_attempt = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(merged, ensure_ascii=False), PENDING, now, now, row[0]),
+                )
+                job_id = row[0]
+            else:
+                job_id = conn.execute(
+                    "INSERT INTO outbox (customer, kind, payload, status, next_attempt, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (customer, kind, json.dumps(payload, ensure_ascii=False), PENDING, now, now, now),
+                ).lastrowid
+        self._wake.set()
+        return job_id
+
+    def retry(self, customer):
+        """'실패'로 멈춘 고객의 요청을 다시 대기열에 올립니다."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt = ?, updated_at = ? WHERE customer = ? AND status = ?",
+                (PENDING, now, now, customer, FAILED),
+            )
+        self._wake.set()
+
+    # --- 상태 ---
+    def status(self, customer):
+        """{"pending": 건수, "failed": 건수, "last_error": 마지막 오류, "synced_at": 마지막 완료 시각}"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*), MAX(updated_at) FROM outbox WHERE customer = ? GROUP BY status", (customer,)
+            ).fetchall()
+            error = conn.execute(
+                "SELECT last_error FROM outbox WHERE customer = ? AND status != ? AND last_error != '' ORDER BY id DESC LIMIT 1",
+                (customer, DONE),
+            ).fetchone()
+        counts = {status: (count, updated) for status, count, updated in rows}
+        return {
+            "pending": counts.get(PENDING, (0, None))[0],
+            "failed": counts.get(FAILED, (0, None))[0],
+            "last_error": error[0] if error else "",
+            "synced_at": counts.get(DONE, (0, None))[1],
+        }
+
+    def unsynced(self):
+        """아직 Notion에 반영되지 않은 요청이 있는 고객들: [(고객, 대기 건수, 실패 건수, 마지막 오류), ...]"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                """SELECT customer, SUM(status = ?), SUM(status = ?),
+                          (SELECT last_error FROM outbox e WHERE e.customer = o.customer AND e.status != ? ORDER BY e.id DESC LIMIT 1)
+                   FROM outbox o WHERE status != ? GROUP BY customer ORDER BY MIN(id)""",
+                (PENDING, FAILED, DONE, DONE),
+            ).fetchall()
+
+    # --- 워커 ---
+    def start(self):
+        """백그라운드 워커를 시작합니다 (이미 실행 중이면 그대로). 저널에 남은 요청부터 보냅니다."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="notion-outbox", daemon=True)
+            self._thread.start()
+
+    def _claim(self):
+        """보낼 차례인 요청 하나: 같은 고객의 앞선 요청이 모두 끝났고(실패로 멈춘 요청도 막습니다) 재시도 시각이 된 가장 오래된 요청"""
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn:
+            row = conn.execute(
+                f"""SELECT id, customer, kind, payload, attempts FROM outbox o
+                    WHERE {_READY} AND next_attempt <= ? ORDER BY id LIMIT 1""",
+                (PENDING, PENDING, FAILED, now),
+            ).fetchone()
+            self._in_flight = row[0] if row else None
+            if row is None:
+                # 앞선 요청에 막힌 요청은 빼고 다음 재시도 시각까지 기다립니다 (없으면 새 요청이 올 때까지).
+                wait = conn.execute(f"SELECT MIN(next_attempt) FROM outbox o WHERE {_READY}", (PENDING, PENDING, FAILED)).fetchone()[0]
+                return None, (max(wait - now, 0.05) if wait else None)
+            return row, 0
+
+    def _checkpoint(self, job_id, payload):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE outbox SET payload = ?, updated_at = ? WHERE id = ?",
+                         (json.dumps(payload, ensure_ascii=False), time.time(), job_id))
+
+    def _finish(self, job_id, attempts, error=None):
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            if error is None:
+                conn.execute("UPDATE outbox SET status = ?, last_error = '', updated_at = ? WHERE id = ?", (DONE, now, job_id))
+                conn.execute("DELETE FROM outbox WHERE status = ? AND updated_at < ?", (DONE, now - KEEP_DONE_SECONDS))
+            else:
+                status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+                conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt = ?, updated_at = ? WHERE id = ?",
+                    (status, attempts, error, now + _backoff(attempts), now, job_id),
+                )
+            self._in_flight = None
+
+    def run_once(self):
+        """보낼 차례인 요청을 하나 처리합니다. (처리했는지, 다음 요청까지 기다릴 초) 를 반환합니다."""
+        row, wait = self._claim()
+        if row is None:
+            return False, wait
+        job_id, customer, kind, payload, attempts = row
+        try:
+            self.handlers[kind](json.loads(payload), lambda updated: self._checkpoint(job_id, updated))
+        except Exception as e:
+            self._finish(job_id, attempts + 1, f"{type(e).__name__}: {e}")
+        else:
+            self._finish(job_id, attempts)
+        return True, 0
+
+    def _run(self):
+        while True:
+            try:
+                worked, wait = self.run_once()
+            except Exception:
+                # 저널 파일을 잠시 열 수 없는 경우 등: 잠깐 쉬었다가 계속합니다.
+                worked, wait = False, 5.0
+            if not worked:
+                self._wake.wait(wait)
+                self._wake.clear()
+
+
+def merge_checkpoint(previous, payload):
+    """합쳐지는 저장 요청: 새 payload 를 쓰되 이전 요청이 이미 만든 페이지 ID는 이어받습니다."""
+    merged = dict(payload)
+    if previous.get("page_id") and not merged.get("page_id"):
+        merged["page_id"] = previous["page_id"]
+    return merged
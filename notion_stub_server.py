@@ -0,0 +1,324 @@
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ─────────────────────────────
+# 🧪 로컬 Notion API 대역 서버
+# ─────────────────────────────
+# 실제 워크스페이스를 건드리지 않고 history_manager 의 조회/저장/삭제를 시험하기 위한 메모리 서버입니다.
+# 이 앱이 쓰는 엔드포인트만 흉내 냅니다:
+#   POST  /v1/databases/{id}/query   (start_cursor/page_size 페이지 나누기, 필터)
+#   POST  /v1/pages                  (페이지 생성)
+#   GET   /v1/pages/{id}
+#   PATCH /v1/pages/{id}             (속성 수정, archived/in_trash 로 보관)
+# 지원하는 필터: and / or, relation contains, title·rich_text equals/contains, number equals,
+#               last_edited_time·created_time on_or_after/after/on_or_before/before
+# 데이터베이스는 처음 쓰일 때 만들어지므로 어떤 ID로도 요청할 수 있습니다.
+# (앱 모듈을 불러오지 않습니다: notion_client 는 불러올 때 NOTION_API_BASE 를 읽으므로
+#  같은 프로세스에서 서버를 먼저 띄우고 주소를 정한 뒤에 앱 모듈을 불러와야 합니다)
+#
+# 사용법:
+#   python notion_stub_server.py --port 8765 --latency-ms 50 --rate 3
+#   NOTION_API_BASE=http://127.0.0.1:8765/v1 streamlit run app.py
+MAX_PAGE_SIZE = 100
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def _db_key(database_id):
+    """Notion ID는 대시가 있어도 없어도 같은 ID입니다."""
+    return database_id.replace("-", "").lower()
+
+class RateLimiter:
+    """서버 쪽 토큰 버킷. 토큰이 없으면 기다리지 않고 다음 토큰까지 남은 초를 돌려줍니다."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+class StubError(Exception):
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+
+# ------------------------------
+# 🔹 저장소
+# ------------------------------
+class NotionStub:
+    """데이터베이스별 페이지를 메모리에 보관합니다 (스레드 안전)."""
+
+    def __init__(self):
+        self._pages = {}        # page_id → 페이지
+        self._databases = {}    # 데이터베이스 키 → [page_id, ...] (생성 순서)
+        self._lock = threading.Lock()
+
+    def add_page(self, database_id, properties, page_id=None):
+        """페이지를 바로 넣습니다 (HTTP 없이 대량으로 채울 때, 생성 응답과 같은 모양)."""
+        now = _now_iso()
+        page = {
+            "object": "page",
+            "id": page_id or str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "in_trash": False,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": properties,
+        }
+        with self._lock:
+            self._pages[page["id"]] = page
+            self._databases.setdefault(_db_key(database_id), []).append(page["id"])
+        return page
+
+    def create_page(self, payload):
+        database_id = (payload.get("parent") or {}).get("database_id")
+        if not database_id:
+            raise StubError(400, "validation_error", "parent.database_id 가 필요합니다.")
+        return self.add_page(database_id, dict(payload.get("properties") or {}))
+
+    def get_page(self, page_id):
+        with self._lock:
+            page = self._pages.get(page_id)
+            if page is None:
+                raise StubError(404, "object_not_found", f"페이지를 찾을 수 없습니다: {page_id}")
+            return page
+
+    def update_page(self, page_id, payload):
+        with self._lock:
+            page = self._pages.get(page_id)
+            if page is None:
+                raise StubError(404, "object_not_found", f"페이지를 찾을 수 없습니다: {page_id}")
+            # 실제 Notion처럼 보관된 페이지의 속성은 바꿀 수 없습니다 (보관/복원 표시만 가능).
+            if page["archived"] and payload.get("properties") and payload.get("archived") is not False:
+                raise StubError(400, "validation_error", "보관된 페이지는 수정할 수 없습니다.")
+            # 응답을 들고 있는 쪽이 바뀐 값을 보지 않도록 새 dict 로 교체합니다.
+            page = {**page, "properties": {**page["properties"], **(payload.get("properties") or {})}}
+            for flag in ("archived", "in_trash"):
+                if flag in payload:
+                    page[flag] = bool(payload[flag])
+            page["last_edited_time"] = _now_iso()
+            self._pages[page_id] = page
+            return page
+
+    def query(self, database_id, payload):
+        """필터에 맞는 보관되지 않은 페이지를 생성 순서대로, 커서(다음 페이지 ID) 단위로 돌려줍니다."""
+        page_size = min(int(payload.get("page_size") or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        query_filter = payload.get("filter")
+        with self._lock:
+            ids = self._databases.get(_db_key(database_id), [])
+            pages = [self._pages[i] for i in ids]
+        matched = [p for p in pages if not p["archived"] and (not query_filter or _matches(p, query_filter))]
+        start = 0
+        cursor = payload.get("start_cursor")
+        if cursor:
+            start = next((i for i, p in enumerate(matched) if p["id"] == cursor), None)
+            if start is None:
+                raise StubError(400, "validation_error", f"잘못된 start_cursor: {cursor}")
+        results = matched[start:start + page_size]
+        has_more = start + page_size < len(matched)
+        return {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": matched[start + page_size]["id"] if has_more else None,
+        }
+
+    def count(self, database_id, include_archived=False):
+        with self._lock:
+            return sum(1 for i in self._databases.get(_db_key(database_id), []) if include_archived or not self._pages[i]["archived"])
+
+# ------------------------------
+# 🔹 필터
+# ------------------------------
+def _text(value):
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in value or [])
+
+def _compare_time(value, condition):
+    for op, bound in condition.items():
+        if op == "on_or_after" and not value >= bound: return False
+        if op == "after" and not value > bound: return False
+        if op == "on_or_before" and not value <= bound: return False
+        if op == "before" and not value < bound: return False
+        if op not in ("on_or_after", "after", "on_or_before", "before"):
+            raise StubError(400, "validation_error", f"지원하지 않는 시간 조건: {op}")
+    return True
+
+def _matches(page, query_filter):
+    if "and" in query_filter:
+        return all(_matches(page, f) for f in query_filter["and"])
+    if "or" in query_filter:
+        return any(_matches(page, f) for f in query_filter["or"])
+    if "timestamp" in query_filter:
+        field = query_filter["timestamp"]
+        return _compare_time(page.get(field, ""), query_filter.get(field, {}))
+    prop = page["properties"].get(query_filter.get("property"), {})
+    if "relation" in query_filter:
+        condition = query_filter["relation"]
+        ids = {r.get("id") for r in prop.get("relation") or []}
+        if "contains" in condition:
+            return condition["contains"] in ids
+        if "is_empty" in condition:
+            return not ids
+    for kind in ("title", "rich_text"):
+        if kind in query_filter:
+            condition, text = query_filter[kind], _text(prop.get(kind))
+            if "equals" in condition:
+                return text == condition["equals"]
+            if "contains" in condition:
+                return condition["contains"] in text
+    if "number" in query_filter and "equals" in query_filter["number"]:
+        return prop.get("number") == query_filter["number"]["equals"]
+    raise StubError(400, "validation_error", f"지원하지 않는 필터: {json.dumps(query_filter, ensure_ascii=False)}")
+
+# ------------------------------
+# 🔹 HTTP 서버
+# ------------------------------
+class StubHandler(BaseHTTPRequestHandler):
+    # 클라이언트가 연결을 재사용할 수 있도록 HTTP/1.1 keep-alive 로 응답합니다.
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문이 따로 나가므로 Nagle 지연(~40ms)이 측정에 섞이지 않게 끕니다.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, code, message, headers=()):
+        self._send(status, {"object": "error", "status": status, "code": code, "message": message}, headers)
+
+    def _handle(self, method):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0].strip("/").split("/")
+        if path and path[0] == "v1":
+            path = path[1:]
+        endpoint = f"{method} {path[0] if path else ''}" + ("/query" if len(path) == 3 and path[2] == "query" else "")
+
+        wait = server.limiter.try_acquire() if server.limiter else 0
+        if wait:
+            server.count(endpoint, 429)
+            return self._error(429, "rate_limited", "요청 한도를 초과했습니다.", [("Retry-After", f"{max(1, round(wait))}")])
+        if server.latency:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if server.error_rate and random.random() < server.error_rate:
+            server.count(endpoint, 503)
+            return self._error(503, "service_unavailable", "일시적인 서버 오류 (시험용)")
+
+        try:
+            payload = json.loads(raw) if raw else {}
+            stub = server.stub
+            if method == "POST" and len(path) == 3 and path[0] == "databases" and path[2] == "query":
+                body = stub.query(path[1], payload)
+            elif method == "POST" and path == ["pages"]:
+                body = stub.create_page(payload)
+            elif method == "GET" and len(path) == 2 and path[0] == "pages":
+                body = stub.get_page(path[1])
+            elif method == "PATCH" and len(path) == 2 and path[0] == "pages":
+                body = stub.update_page(path[1], payload)
+            else:
+                raise StubError(400, "invalid_request_url", f"지원하지 않는 요청: {method} /{'/'.join(path)}")
+        except StubError as e:
+            server.count(endpoint, e.status)
+            return self._error(e.status, e.code, str(e))
+        except ValueError as e:
+            server.count(endpoint, 400)
+            return self._error(400, "invalid_json", str(e))
+        server.count(endpoint, 200)
+        self._send(200, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+class NotionStubServer(ThreadingHTTPServer):
+    """NotionStub 을 HTTP로 내보내는 서버.
+
+    latency/jitter: 요청마다 더할 지연 (초), rate/burst: 초당 허용 요청 (0이면 무제한, 넘으면 429 + Retry-After),
+    error_rate: 무작위 503 비율
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), stub=None, latency=0.0, jitter=0.0, rate=0.0, burst=None, error_rate=0.0):
+        super().__init__(address, StubHandler)
+        self.stub = stub or NotionStub()
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = RateLimiter(rate, burst or max(1, int(rate))) if rate else None
+        self.error_rate = error_rate
+        self.stats = Counter()      # (엔드포인트, 상태 코드) → 건수
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, endpoint, status):
+        with self._stats_lock:
+            self.stats[(endpoint, status)] += 1
+
+    def start(self):
+        """백그라운드 스레드에서 요청을 받기 시작합니다."""
+        threading.Thread(target=self.serve_forever, name="notion-stub", daemon=True).start()
+        return self
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="로컬 Notion API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="요청마다 더할 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="지연에 더할 무작위 범위 (ms)")
+    parser.add_argument("--rate", type=float, default=0, help="초당 허용 요청 수 (0이면 무제한, 넘으면 429)")
+    parser.add_argument("--burst", type=int, help="한 번에 허용할 요청 수 (기본: rate)")
+    parser.add_argument("--error-rate", type=float, default=0, help="무작위 503 응답 비율 (0~1)")
+    args = parser.parse_args(argv)
+
+    server = NotionStubServer((args.host, args.port), latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                              rate=args.rate, burst=args.burst, error_rate=args.error_rate)
+    print(f"NOTION_API_BASE={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
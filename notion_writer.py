@@ -0,0 +1,68 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# ─────────────────────────────
+# ✍️ Notion 쓰기 파이프라인 설정
+# ─────────────────────────────
+WRITE_WORKERS = 4
+
+# ------------------------------
+# 🔹 결과 보고
+# ------------------------------
+# label: 화면에 보여줄 이름, ok: 성공 여부, status: HTTP 상태 코드, error: 실패 사유, response: 응답 JSON
+WriteResult = namedtuple("WriteResult", ["label", "ok", "status", "error", "response"])
+
+
+class WriteReport:
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def ok(self):
+        return all(r.ok for r in self.results)
+
+    @property
+    def failures(self):
+        return [r for r in self.results if not r.ok]
+
+    def summary(self):
+        failed = self.failures
+        text = f"성공 {len(self.results) - len(failed)}건 / 실패 {len(failed)}건"
+        if failed:
+            text += "\n" + "\n".join(f"- {r.label}: {r.error}" for r in failed)
+        return text
+
+# ------------------------------
+# 🔹 동시 쓰기 실행기
+# ------------------------------
+class NotionWriteExecutor:
+    """Notion 쓰기 요청을 스레드 풀로 동시에 보냅니다 (요청 한도와 재시도는 NotionClient 가 처리)."""
+
+    def __init__(self, client, max_workers=WRITE_WORKERS):
+        self.client = client
+        self.max_workers = max_workers
+
+    def _send(self, label, method, path, payload):
+        try:
+            res = self.client.request(method, path, payload, name=f"{method} {path.split('/')[0]}")
+        except requests.RequestException as e:
+            return WriteResult(label, False, None, str(e), None)
+        status = res.status_code
+        if status == 429:
+            return WriteResult(label, False, status, "요청 한도 초과 (429)", None)
+        if status >= 500:
+            return WriteResult(label, False, status, f"Notion 서버 오류 ({status})", None)
+        if status >= 400:
+            try: error = res.json().get("message", res.text)
+            except ValueError: error = res.text
+            return WriteResult(label, False, status, error, None)
+        return WriteResult(label, True, status, "", res.json())
+
+    def run(self, calls):
+        """calls: [(label, method, path, payload), ...] → 입력 순서대로 정리된 WriteReport"""
+        if not calls:
+            return WriteReport([])
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(calls))) as pool:
+            results = list(pool.map(lambda call: self._send(*call), calls))
+        return WriteReport(results)
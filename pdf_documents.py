@@ -0,0 +1,89 @@
+import threading
+import fitz
+from session_lease import SessionLeases
+
+# ─────────────────────────────
+# 📄 업로드 PDF 공유 문서 핸들
+# ─────────────────────────────
+# 업로드 한 건당 PDF 바이트와 열린 fitz 문서를 하나만 두고, 텍스트 추출과 미리보기 렌더링이 함께 씁니다.
+# (파일을 다시 읽거나 페이지마다 문서 구조를 다시 해석하지 않습니다)
+# 같은 내용의 PDF를 여러 세션이 보고 있으면 핸들 하나를 나눠 쓰고, 아무 세션도 보지 않게 되면 닫습니다.
+
+# MuPDF는 스레드 간 동시 사용을 지원하지 않으므로 문서 사용(추출/래스터화)은 한 번에 하나씩만 합니다.
+mupdf_lock = threading.Lock()
+
+# ------------------------------
+# 🔹 문서 핸들
+# ------------------------------
+class PdfHandle:
+    """PDF 바이트 + 열린 fitz 문서. doc 을 쓸 때는 mupdf_lock 을 잡고 closed 를 확인해야 합니다."""
+
+    def __init__(self, pdf_hash, data):
+        self.pdf_hash = pdf_hash
+        self.data = data
+        self.doc = fitz.open(stream=data, filetype="pdf")
+        self.page_count = len(self.doc)
+        self.closed = False
+
+    def close(self):
+        with mupdf_lock:
+            if not self.closed:
+                self.closed = True
+                self.doc.close()
+
+
+class PdfDocuments:
+    """pdf_hash → PdfHandle. 세션(owner)마다 보고 있는 PDF를 기록해 쓰지 않는 핸들을 닫습니다."""
+
+    def __init__(self):
+        self._handles = {}
+        self._owners = {}           # 세션 식별자 → 보고 있는 PDF 해시
+        self._leases = SessionLeases()  # 끝난 세션은 다음 호출 때 정리
+        self._lock = threading.Lock()
+
+    def open(self, pdf_hash, data, owner):
+        """owner 세션이 pdf_hash 문서를 보기 시작합니다. 이미 열린 핸들이 있으면 그대로 씁니다."""
+        self._release_ended()
+        with self._lock:
+            handle = self._handles.get(pdf_hash)
+            if handle is None:
+                handle = self._handles[pdf_hash] = PdfHandle(pdf_hash, data)
+            previous = self._owners.get(owner)
+            self._owners[owner] = pdf_hash
+        if previous and previous != pdf_hash:
+            self._forget(previous)
+        return handle
+
+    def get(self, pdf_hash):
+        """열려 있는 핸들 (없으면 None)"""
+        with self._lock:
+            return self._handles.get(pdf_hash)
+
+    def release(self, owner):
+        with self._lock:
+            previous = self._owners.pop(owner, None)
+        if previous:
+            self._forget(previous)
+
+    def lease(self, owner):
+        """세션 상태에 넣어 둘 토큰. 세션 상태가 사라지면(세션 종료/초기화) 그 세션을 release() 합니다."""
+        return self._leases.lease(owner)
+
+    def _release_ended(self):
+        self._leases.release_ended(self.release)
+
+    def _forget(self, pdf_hash):
+        with self._lock:
+            if pdf_hash in self._owners.values():
+                return
+            handle = self._handles.pop(pdf_hash, None)
+        if handle is not None:
+            handle.close()
+
+    def summary(self):
+        self._release_ended()
+        with self._lock:
+            return {"documents": len(self._handles), "bytes": sum(len(h.data) for h in self._handles.values()), "sessions": len(self._owners)}
+
+
+pdf_documents = PdfDocuments()
@@ -0,0 +1,204 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import fitz
+from perf_metrics import span
+from disk_store import disk_store
+from pdf_documents import pdf_documents, mupdf_lock
+
+# ─────────────────────────────
+# 🖼️ 미리보기 렌더 캐시 설정
+# ─────────────────────────────
+# 프로세스 전체에서 공유되는 PNG 캐시의 최대 크기 (MB)
+RENDER_CACHE_MAX_MB = int(os.environ.get("LTV_RENDER_CACHE_MB", "64"))
+# 백그라운드 미리 렌더링 워커 수
+PREFETCH_WORKERS = int(os.environ.get("LTV_PREFETCH_WORKERS", "1"))
+# 화면에 크게 보이는 페이지 / 전체 페이지 썸네일의 렌더링 배율
+PREVIEW_ZOOM = 2.0
+THUMB_ZOOM = float(os.environ.get("LTV_THUMB_ZOOM", "0.25"))
+
+# ------------------------------
+# 🔹 LRU 렌더 캐시
+# ------------------------------
+class PageRenderCache:
+    """(파일 해시, 페이지 번호, 배율) → PNG 바이트를 보관하는 메모리 상한 LRU 캐시"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = png
+            self._size += len(png)
+            # 가장 오래 사용되지 않은 항목부터 제거
+            while self._size > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    @property
+    def size(self):
+        return self._size
+
+
+render_cache = PageRenderCache(RENDER_CACHE_MAX_MB * 1024 * 1024)
+_page_counts = {}
+
+_prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="pdf-prefetch")
+_prefetch_lock = threading.Lock()
+_inflight = {}          # 캐시 키 → Future
+_owner_jobs = {}        # 세션 식별자 → (파일 해시, [Future, ...])
+
+# ------------------------------
+# 🔹 미리보기 함수
+# ------------------------------
+def file_hash(data):
+    """PDF 바이트의 SHA-256 해시 (캐시 키로 사용)"""
+    return hashlib.sha256(data).hexdigest()
+
+def _hash_of_path(pdf_path):
+    with open(pdf_path, "rb") as f:
+        return file_hash(f.read())
+
+def get_page_count(pdf_path, pdf_hash=None):
+    handle = pdf_documents.get(pdf_hash) if pdf_hash else None
+    if handle is not None:
+        return handle.page_count
+    pdf_hash = pdf_hash or _hash_of_path(pdf_path)
+    if pdf_hash not in _page_counts:
+        with fitz.open(pdf_path) as doc:
+            _page_counts[pdf_hash] = len(doc)
+    return _page_counts[pdf_hash]
+
+def _render_page(pdf_path, page_num, zoom, pdf_hash):
+    key = (pdf_hash, page_num, zoom)
+    # 메모리 캐시 → 디스크 저장소 → 새로 렌더링 순으로 찾습니다.
+    png = render_cache.get(key) or disk_store.get_render(pdf_hash, page_num, zoom)
+    if png is None:
+        # 업로드 때 열어 둔 문서가 있으면 그대로 쓰고, 없으면(닫혔거나 다른 프로세스) 파일을 엽니다.
+        handle = pdf_documents.get(pdf_hash)
+        with mupdf_lock:
+            png = render_cache.get(key)
+            if png is not None:
+                return png
+            with span("pymupdf.get_pixmap"):
+                if handle is not None and not handle.closed:
+                    png = _rasterize(handle.doc, page_num, zoom)
+                else:
+                    with fitz.open(pdf_path) as doc:
+                        png = _rasterize(doc, page_num, zoom)
+            if png is None:
+                return None
+        disk_store.put_render(pdf_hash, page_num, zoom, png)
+    render_cache.put(key, png)
+    return png
+
+def _rasterize(doc, page_num, zoom):
+    if page_num >= len(doc):
+        return None
+    page = doc.load_page(page_num)
+    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=mat)
+    return pix.tobytes("png")
+
+def pdf_to_image(pdf_path, page_num, zoom=PREVIEW_ZOOM, pdf_hash=None):
+    """페이지를 PNG로 렌더링합니다. 같은 파일/페이지/배율은 캐시에서 바로 반환합니다."""
+    with span("pdf_to_image"):
+        return _pdf_to_image(pdf_path, page_num, zoom, pdf_hash)
+
+def _pdf_to_image(pdf_path, page_num, zoom, pdf_hash):
+    pdf_hash = pdf_hash or _hash_of_path(pdf_path)
+    key = (pdf_hash, page_num, zoom)
+    png = render_cache.get(key)
+    if png is not None:
+        return png
+
+    # 이미 백그라운드에서 렌더링 중이면 새로 그리지 않고 그 결과를 기다립니다.
+    # 아직 대기열에만 있는 작업은 (다른 세션 작업 뒤에 있을 수 있으므로) 취소하고 여기서 바로 그립니다.
+    with _prefetch_lock:
+        future = _inflight.get(key)
+        if future is not None and not future.running() and future.cancel():
+            _inflight.pop(key, None)
+            future = None
+    if future is not None and not future.cancelled():
+        try:
+            png = future.result()
+            if png is not None:
+                return png
+        except Exception:
+            pass
+    return _render_page(pdf_path, page_num, zoom, pdf_hash)
+
+def pdf_thumbnail(pdf_path, page_num, pdf_hash=None):
+    """썸네일용 저배율 렌더링 (같은 캐시를 씁니다)"""
+    return pdf_to_image(pdf_path, page_num, zoom=THUMB_ZOOM, pdf_hash=pdf_hash)
+
+# ------------------------------
+# 🔹 백그라운드 미리 렌더링
+# ------------------------------
+def _prefetch_job(pdf_path, page_num, zoom, pdf_hash, owner):
+    key = (pdf_hash, page_num, zoom)
+    try:
+        with _prefetch_lock:
+            current = _owner_jobs.get(owner)
+        # 그 사이 다른 PDF가 올라왔다면 오래된 작업은 건너뜁니다.
+        if current is None or current[0] != pdf_hash:
+            return None
+        return _render_page(pdf_path, page_num, zoom, pdf_hash)
+    finally:
+        with _prefetch_lock:
+            _inflight.pop(key, None)
+
+def _cancel_jobs(futures):
+    for future in futures:
+        future.cancel()
+    for key, future in list(_inflight.items()):
+        if future.cancelled():
+            _inflight.pop(key, None)
+
+def prefetch_pages(pdf_path, page_nums, owner, zoom=PREVIEW_ZOOM, pdf_hash=None):
+    """주어진 페이지들을 백그라운드에서 미리 렌더링해 둡니다 (이미 캐시에 있거나 렌더링 중이면 건너뜀)."""
+    pdf_hash = pdf_hash or _hash_of_path(pdf_path)
+    with _prefetch_lock:
+        current = _owner_jobs.get(owner)
+        if current is None or current[0] != pdf_hash:
+            if current is not None:
+                _cancel_jobs(current[1])
+            current = (pdf_hash, [])
+            _owner_jobs[owner] = current
+        jobs = [f for f in current[1] if not f.done()]
+        for page_num in page_nums:
+            key = (pdf_hash, page_num, zoom)
+            if key in _inflight or key in render_cache:
+                continue
+            future = _prefetch_pool.submit(_prefetch_job, pdf_path, page_num, zoom, pdf_hash, owner)
+            _inflight[key] = future
+            jobs.append(future)
+        _owner_jobs[owner] = (pdf_hash, jobs)
+
+def cancel_prefetch(owner):
+    """세션의 대기 중인 미리 렌더링 작업을 취소합니다 (새 PDF 업로드 시)."""
+    with _prefetch_lock:
+        current = _owner_jobs.pop(owner, None)
+        if current is not None:
+            _cancel_jobs(current[1])
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict, deque
+from local_store import CACHE_DIR
+
+# ─────────────────────────────
+# ⏱️ 구간별 실행 시간 기록 / 내보내기
+# ─────────────────────────────
+# 구간 이름별로 최근 WINDOW 건의 소요 시간(분위수용)과 누적 건수/합계를 프로세스 전체에서 모읍니다.
+# 한 번의 실행(rerun) 동안 기록된 구간은 실행별 내역으로도 묶어 둡니다.
+#
+# 내보내기 (LTV_METRICS_EXPORT, 쉼표 구분, 기본은 끔):
+#   prometheus: CACHE_DIR/metrics.prom 을 EXPORT_INTERVAL 초마다 덮어씁니다 (node_exporter textfile 형식).
+#   json:       실행이 끝날 때마다 CACHE_DIR/metrics.jsonl 에 한 줄씩 추가합니다.
+WINDOW = 200
+RECENT_RUNS = 50
+EXPORT_INTERVAL = 10.0
+EXPORT_FORMATS = {f.strip() for f in os.environ.get("LTV_METRICS_EXPORT", "").split(",") if f.strip()}
+PROMETHEUS_PATH = os.path.join(CACHE_DIR, "metrics.prom")
+JSON_LOG_PATH = os.path.join(CACHE_DIR, "metrics.jsonl")
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+_timings = defaultdict(lambda: deque(maxlen=WINDOW))
+_totals = defaultdict(lambda: [0, 0.0])      # 구간 → [누적 건수, 누적 초]
+_recent_runs = deque(maxlen=RECENT_RUNS)
+_lock = threading.Lock()
+_local = threading.local()                   # 현재 스레드에서 진행 중인 실행
+_last_export = 0.0
+
+def record(name, seconds):
+    with _lock:
+        _timings[name].append(seconds)
+        total = _totals[name]
+        total[0] += 1
+        total[1] += seconds
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run["spans"][name] = run["spans"].get(name, 0.0) + seconds
+
+@contextmanager
+def span(name):
+    """with span("이름"): ... 블록의 소요 시간을 기록합니다 (중간에 예외로 끝나도 기록)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+# ------------------------------
+# 🔹 실행(rerun) 단위 내역
+# ------------------------------
+def begin_run(name):
+    """이 스레드의 실행 기록을 시작합니다.
+
+    st.rerun()/st.stop() 으로 끝나지 못한 이전 실행이 남아 있으면 버리고 새로 시작합니다.
+    """
+    run = {"name": name, "started": time.perf_counter(), "at": time.time(), "spans": {}}
+    _local.run = run
+    return run
+
+def end_run(run):
+    """실행 기록을 마치고 {"name", "at", "total_ms", "spans": {구간: ms}} 를 반환합니다."""
+    if run is None:
+        return None
+    _local.run = None
+    seconds = time.perf_counter() - run["started"]
+    record(run["name"], seconds)
+    result = {
+        "name": run["name"],
+        "at": round(run["at"], 3),
+        "total_ms": round(seconds * 1000, 1),
+        "spans": {name: round(s * 1000, 1) for name, s in sorted(run["spans"].items(), key=lambda kv: -kv[1])},
+    }
+    with _lock:
+        _recent_runs.append(result)
+    _export(result)
+    return result
+
+def recent_runs():
+    with _lock:
+        return list(_recent_runs)
+
+# ------------------------------
+# 🔹 집계
+# ------------------------------
+def _quantile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+def summary(prefix=""):
+    """{구간: {"count", "avg_ms", "p50_ms", "p95_ms", "max_ms"}} (최근 WINDOW 건 기준)"""
+    with _lock:
+        snapshot = {name: sorted(values) for name, values in _timings.items() if values and name.startswith(prefix)}
+    result = {}
+    for name, values in snapshot.items():
+        n = len(values)
+        result[name[len(prefix):]] = {
+            "count": n,
+            "avg_ms": round(sum(values) / n * 1000, 1),
+            "p50_ms": round(_quantile(values, 0.5) * 1000, 1),
+            "p95_ms": round(_quantile(values, 0.95) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+    return result
+
+# ------------------------------
+# 🔹 내보내기
+# ------------------------------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+def prometheus_text():
+    """Prometheus 텍스트 형식 (분위수는 최근 WINDOW 건, count/sum 은 프로세스 시작 후 누적)"""
+    with _lock:
+        snapshot = {name: (sorted(values), list(_totals[name])) for name, values in _timings.items() if values}
+    lines = [
+        "# HELP ltv_span_seconds Time spent in instrumented LTV calculator spans.",
+        "# TYPE ltv_span_seconds summary",
+    ]
+    for name, (values, (count, total)) in sorted(snapshot.items()):
+        label = _label(name)
+        for q in QUANTILES:
+            lines.append(f'ltv_span_seconds{{span="{label}",quantile="{q}"}} {_quantile(values, q):.6f}')
+        lines.append(f'ltv_span_seconds_count{{span="{label}"}} {count}')
+        lines.append(f'ltv_span_seconds_sum{{span="{label}"}} {total:.6f}')
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path=PROMETHEUS_PATH):
+    # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 바꿔치기합니다.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+def append_json_log(run, path=JSON_LOG_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+def _export(run):
+    global _last_export
+    try:
+        if "json" in EXPORT_FORMATS:
+            append_json_log(run)
+        if "prometheus" in EXPORT_FORMATS:
+            now = time.monotonic()
+            if now - _last_export >= EXPORT_INTERVAL:
+                _last_export = now
+                write_prometheus()
+    except OSError:
+        # 계측 파일을 쓰지 못해도 화면 동작에는 영향을 주지 않습니다.
+        pass
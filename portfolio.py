@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from ltv_map import region_map
+from ltv_engine import parse_korean_number
+
+# ─────────────────────────────
+# 📊 전체 고객 LTV 일괄 계산
+# ─────────────────────────────
+# ltv_engine.calculate_ltv 의 한도/가용 계산을 모든 고객 × 모든 LTV 비율에 대해 한 번에 수행합니다.
+#   선순위: 한도 = int(시세 × LTV - 방공제),            가용 = 한도 - (대환 + 선말소 원금)
+#   후순위: 한도 = int(시세 × LTV - 유지 채권최고액 - 방공제), 가용 = 한도 - (유지 외 원금)
+#   ('유지' 채권최고액 합계가 0보다 크면 후순위, 아니면 선순위이며 두 값 모두 10만 단위 내림)
+
+def _digits(series):
+    """ltv_engine.parse_comma_number 와 같이 숫자만 남겨 정수로 바꿉니다 (빈 값은 0)."""
+    # 정수와 None 이 섞여 float 로 바뀌면 "123.0" → 1230 이 되므로 object 로 두고 문자열화합니다.
+    cleaned = series.astype(object).where(series.notna(), "").astype(str).str.replace(r"[^\d]", "", regex=True)
+    return pd.to_numeric(cleaned.where(cleaned != "", "0")).astype("int64")
+
+def build_portfolio_frames(customers, loan_rows_by_customer):
+    """고객/대출 데이터를 계산용 표 두 개로 바꿉니다.
+
+    customers: {고객명: 고객 데이터}  (history_manager 의 공유 고객 목록)
+    loan_rows_by_customer: {고객 page_id: [(설정자, 채권최고액, 설정비율, 원금, 진행구분), ...]}
+    """
+    cust = pd.DataFrame({
+        "고객명": list(customers.keys()),
+        "page_id": [c.get("notion_page_id") for c in customers.values()],
+        "KB시세": pd.Series([c.get("raw_price_input", "") for c in customers.values()], dtype=object),
+        "방공제 지역": [c.get("region", "") or "" for c in customers.values()],
+    })
+    # 시세는 "25억 0천만" 같은 한글 입력도 있으므로 화면과 같은 parse_korean_number 로 해석합니다.
+    cust["KB시세"] = cust["KB시세"].map(parse_korean_number).astype("int64")
+    # 불러오기 후 화면은 지역이 바뀐 것으로 보고 방공제 금액을 지역 기본값으로 채우므로 같은 값을 씁니다.
+    cust["방공제"] = cust["방공제 지역"].map(region_map).fillna(0).astype("int64")
+
+    records = [
+        (page_id, max_amt, principal, status)
+        for page_id, rows in loan_rows_by_customer.items()
+        for _, max_amt, _, principal, status in rows
+    ]
+    loans = pd.DataFrame(records, columns=["page_id", "채권최고액", "원금", "진행구분"], dtype=object)
+    loans["채권최고액"] = _digits(loans["채권최고액"])
+    loans["원금"] = _digits(loans["원금"])
+    return cust, loans
+
+def loan_sums(cust, loans):
+    """고객별 대환/선말소 원금, 유지 채권최고액, 유지 외 원금 합계 (cust 와 같은 순서의 배열)"""
+    status = loans["진행구분"]
+    grouped = pd.DataFrame({
+        "page_id": loans["page_id"],
+        "대환": loans["원금"].where(status == "대환", 0),
+        "선말소": loans["원금"].where(status == "선말소", 0),
+        "유지": loans["채권최고액"].where(status == "유지", 0),
+        "후순위원금": loans["원금"].where(status != "유지", 0),
+    }).groupby("page_id").sum()
+    sums = grouped.reindex(cust["page_id"]).fillna(0).astype("int64")
+    return sums["대환"].to_numpy(), sums["선말소"].to_numpy(), sums["유지"].to_numpy(), sums["후순위원금"].to_numpy()
+
+def compute_limits(total_value, deduction, senior_principal, maintain_maxamt, sub_principal, ratios):
+    """배열 입력으로 한도/가용을 계산합니다. 반환: (한도, 가용, 후순위 여부) 각각 (고객 수, 비율 수) 배열"""
+    tv = np.asarray(total_value, dtype="int64")[:, None]
+    ded = np.asarray(deduction, dtype="int64")[:, None]
+    maintain = np.asarray(maintain_maxamt, dtype="int64")[:, None]
+    rate = np.asarray(ratios, dtype="float64")[None, :] / 100
+    is_sub = maintain > 0
+
+    # 파이썬 int() 와 같이 0 방향으로 자른 뒤, 10 단위 내림(//)을 적용합니다.
+    senior_limit = np.trunc(tv * rate - ded)
+    sub_limit = np.trunc(tv * rate - maintain - ded)
+    limit = np.where(is_sub, sub_limit, senior_limit).astype("int64")
+    principal = np.where(is_sub, np.asarray(sub_principal, dtype="int64")[:, None], np.asarray(senior_principal, dtype="int64")[:, None])
+    available = limit - principal
+    return limit // 10 * 10, available // 10 * 10, np.broadcast_to(is_sub, limit.shape)
+
+def compute_portfolio(cust, loans, ratios):
+    """모든 고객 × 모든 LTV 비율의 한도/가용 (긴 형식 DataFrame)"""
+    ratios = list(ratios)
+    dh, sm, maintain, sub_principal = loan_sums(cust, loans)
+    limit, available, is_sub = compute_limits(cust["KB시세"], cust["방공제"], dh + sm, maintain, sub_principal, ratios)
+    n = len(cust)
+    return pd.DataFrame({
+        "고객명": np.repeat(cust["고객명"].to_numpy(), len(ratios)),
+        "page_id": np.repeat(cust["page_id"].to_numpy(), len(ratios)),
+        "LTV": np.tile(ratios, n),
+        "구분": np.where(is_sub.ravel(), "후순위", "선순위"),
+        "한도": limit.ravel(),
+        "가용": available.ravel(),
+    })
+
+def rank_by_available(result, ltv=None, top=None):
+    """가용 금액이 큰 순서로 정렬합니다. ltv 를 주면 그 비율만 남깁니다."""
+    if ltv is not None:
+        result = result[result["LTV"] == ltv]
+    ranked = result.sort_values("가용", ascending=False, kind="stable").reset_index(drop=True)
+    return ranked.head(top) if top else ranked
+
+# ------------------------------
+# 🔹 시나리오 (시세 변동 × LTV 비율)
+# ------------------------------
+def sensitivity_grid(total_value, deduction, senior_principal, maintain_maxamt, sub_principal, shocks, ratios):
+    """한 건의 시세 변동(%) × LTV 비율(%) 격자를 선순위/후순위 두 경로 모두 한 번에 계산합니다.
+
+    반환: 가격변동, 시세, LTV, 구분, 한도, 가용 열을 가진 긴 형식 DataFrame
+    """
+    shocks = np.asarray(list(shocks), dtype="float64")
+    ratios = np.asarray(list(ratios), dtype="float64")
+    price = np.trunc(total_value * (1 + shocks / 100))[:, None]
+    rate = ratios[None, :] / 100
+
+    frames = []
+    for label, minus, principal in (("선순위", 0, senior_principal), ("후순위", maintain_maxamt, sub_principal)):
+        limit = np.trunc(price * rate - minus - deduction).astype("int64")
+        available = limit - int(principal)
+        frames.append(pd.DataFrame({
+            "가격변동": np.repeat(shocks, len(ratios)),
+            "시세": np.repeat(price[:, 0], len(ratios)).astype("int64"),
+            "LTV": np.tile(ratios, len(shocks)).astype("int64"),
+            "구분": label,
+            "한도": (limit // 10 * 10).ravel(),
+            "가용": (available // 10 * 10).ravel(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def sensitivity_table(grid, path, metric):
+    """격자에서 한 경로/지표만 골라 (가격변동 × LTV) 표로 펼칩니다."""
+    view = grid[grid["구분"] == path].pivot(index="가격변동", columns="LTV", values=metric)
+    view.index = [f"{s:+.0f}%" for s in view.index]
+    view.columns = [f"LTV {c}%" for c in view.columns]
+    return view
@@ -0,0 +1,138 @@
+import re
+from collections import namedtuple
+from ltv_map import region_map
+
+# ─────────────────────────────
+# 🗺️ 주소 → 방공제 지역 자동 판별
+# ─────────────────────────────
+# region_map 의 키(예: "경기도 남양주시 호평동/평내동/…", "인천광역시 그 밖의 지역")를
+# 시/도 → 시/군/구 → 동 토큰 트리로 한 번만 컴파일해 두고, 주소 토큰을 따라 내려가며 찾습니다.
+#   일치 우선순위: 동 > 시/군/구 > 광역시 군지역 규칙 > 시/군/구의 '그밖의 지역' > 시/도의 '그밖의 지역' > 전체 '그밖의 지역'
+# 주소만으로 알 수 없는 지역(경제자유구역, 반월특수지역, 방공제없음)은 자동 판별하지 않고 직접 고르게 둡니다.
+MANUAL_ONLY = ("인천경제자유구역/남동국가산업단지", "경기도 시흥시 반월특수지역", "방공제없음")
+
+# region: region_map 키, deduction: 방공제 금액(만원), rule: 어떤 규칙으로 찾았는지 (화면 안내용)
+Resolution = namedtuple("Resolution", ["region", "deduction", "rule"])
+
+_FALLBACK = "*"     # 그 밖의 지역
+_COUNTY = "군"      # 광역시 군지역
+_FALLBACK_RE = re.compile(r"^(.*?)\s*그\s*밖의\s*지역$")
+_PAREN_RE = re.compile(r"[(),\[\]]")
+_SIDO_SUFFIX_RE = re.compile(r"(특별자치시|특별자치도|특별시|광역시|도)$")
+
+# 주소의 시/도 표기(정식 명칭·약칭)를 하나의 이름으로 맞춥니다.
+_SIDO_ALIASES = {
+    "서울": "서울", "부산": "부산", "대구": "대구", "인천": "인천", "광주": "광주", "대전": "대전", "울산": "울산",
+    "세종": "세종", "경기": "경기", "강원": "강원", "충북": "충청북", "충남": "충청남", "전북": "전라북", "전남": "전라남",
+    "경북": "경상북", "경남": "경상남", "제주": "제주",
+}
+# 시/군/구 없이 바로 동으로 내려가는 광역 단위 (region_map 에서 다른 시/도의 시 목록에 섞여 있음)
+_SINGLE_TIER = ("세종",)
+
+def _sido(token):
+    """"서울특별시" / "서울시" / "서울" → "서울", "경기도" → "경기" (시/도가 아니면 None)"""
+    stem = _SIDO_SUFFIX_RE.sub("", token)
+    if stem.endswith("시") and stem[:-1] in _SIDO_ALIASES:
+        stem = stem[:-1]
+    return _SIDO_ALIASES.get(stem, stem if token != stem and stem in _SIDO_ALIASES.values() else None)
+
+
+class RegionResolver:
+    """region_map 을 토큰 트리로 컴파일한 판별기. resolve() 는 주소 한 건을 판별합니다."""
+
+    def __init__(self, regions=region_map, manual_only=MANUAL_ONLY):
+        self.regions = dict(regions)
+        self.tree = {}                 # 시/도 → {"*": 키, "군": 키, 시군구 → {"*": 키, "": 키, 동 → 키}}
+        self.default = None            # 전체 '그밖의 지역'
+        for key in self.regions:
+            if key not in manual_only:
+                self._compile(key)
+
+    # --- 컴파일 ---
+    def _node(self, sido, sigungu=None):
+        node = self.tree.setdefault(sido, {})
+        return node.setdefault(sigungu, {}) if sigungu else node
+
+    def _compile(self, key):
+        fallback = _FALLBACK_RE.match(key)
+        body = fallback.group(1) if fallback else key
+        if not body:
+            self.default = key
+            return
+        head, _, rest = body.partition(" ")
+        # "광주/대구/대전/부산/울산 군지역 (외)" 처럼 시/도가 여러 개인 그룹
+        if "/" in head and all(_sido(name) for name in head.split("/")):
+            for name in head.split("/"):
+                node = self._node(_sido(name))
+                node[_FALLBACK if rest.endswith("외") else _COUNTY] = key
+            return
+        sido = _sido(head)
+        if sido is None:
+            return
+        if not rest:
+            self._node(sido)[_FALLBACK] = key
+            return
+        parts = rest.split()
+        names = parts[0].split("/")
+        if len(parts) == 1 and all(n.endswith(("시", "군", "구")) for n in names):
+            for name in names:
+                self._node(sido, name)["" if not fallback else _FALLBACK] = key
+                # "경기도 화성시/세종시/김포시" 의 세종시는 주소에서 시/도 자리에 오므로 그 단위로도 등록합니다.
+                if _sido(name) in _SINGLE_TIER:
+                    self._node(_sido(name))[_FALLBACK] = key
+        elif len(parts) == 1 and fallback is None:
+            # "인천광역시 대곡동/불로동/…" 처럼 시/군/구 없이 동만 나열된 그룹
+            for name in names:
+                self._node(sido).setdefault("동", {})[name] = key
+        else:
+            sigungu_node = self._node(sido, parts[0])
+            if fallback:
+                sigungu_node[_FALLBACK] = key
+            else:
+                for name in parts[1].split("/"):
+                    sigungu_node[name] = key
+    
+    # --- 판별 ---
+    def resolve(self, address):
+        """주소 → Resolution (판별할 수 없으면 None)"""
+        tokens = _PAREN_RE.sub(" ", str(address or "")).split()
+        if not tokens:
+            return None
+        sido = _sido(tokens[0])
+        node = self.tree.get(sido) if sido else None
+        if node is None:
+            return self._result(self.default, "그밖의 지역") if sido else None
+
+        rest = tokens[1:]
+        sigungu = rest[0] if rest else ""
+        dong_node = node.get("동", {})
+        for token in rest:
+            if token in dong_node:
+                return self._result(dong_node[token], f"동: {token}")
+
+        sub = node.get(sigungu) if isinstance(node.get(sigungu), dict) else None
+        if sub is not None:
+            for token in rest[1:]:
+                if token in sub and token not in ("", _FALLBACK):
+                    return self._result(sub[token], f"동: {token}")
+            if "" in sub:
+                return self._result(sub[""], f"시군구: {sigungu}")
+        if sigungu.endswith("군") and _COUNTY in node:
+            return self._result(node[_COUNTY], f"군지역: {sigungu}")
+        if sub is not None and _FALLBACK in sub:
+            return self._result(sub[_FALLBACK], f"{sigungu} 그밖의 지역")
+        if _FALLBACK in node:
+            return self._result(node[_FALLBACK], f"시/도: {tokens[0]}")
+        return self._result(self.default, "그밖의 지역")
+
+    def _result(self, key, rule):
+        if key is None:
+            return None
+        return Resolution(key, self.regions[key], rule)
+
+
+# region_map 은 코드에 고정되어 있으므로 프로세스에서 한 번만 컴파일합니다.
+region_resolver = RegionResolver()
+
+def resolve_region(address):
+    return region_resolver.resolve(address)
@@ -0,0 +1,289 @@
+import re
+from contextlib import contextmanager
+from collections import namedtuple
+import fitz
+from perf_metrics import span
+
+# ─────────────────────────────
+# 📑 등기부등본 구역 정의
+# ─────────────────────────────
+# 추출 결과 형식이 바뀌면 올려서 저장된 추출 캐시를 무효화합니다.
+PARSER_VERSION = 3
+
+# 구역 이름 → 머리글 패턴 (문서에 나타나는 순서대로)
+SECTION_PATTERNS = {
+    "표제부": r"【\s*표\s*제\s*부\s*】",
+    "갑구": r"【\s*갑\s*구\s*】",
+    "을구": r"【\s*을\s*구\s*】",
+    "요약": r"주요\s*등기사항\s*요약",
+}
+_SECTION_RE = re.compile("|".join(f"(?P<s{i}>{p})" for i, p in enumerate(SECTION_PATTERNS.values())))
+_SECTION_NAMES = {f"s{i}": name for i, name in enumerate(SECTION_PATTERNS)}
+
+_ADDRESS_RE = re.compile(r"\[집합건물\]\s*([^\n]+)")
+_LOCATION_RE = re.compile(r"소재지\s*[:：]?\s*([^\n]+)")
+_AREA_RE = re.compile(r"(\d+\.\d+)\s*㎡")
+_FLOOR_RE = re.compile(r"제(\d+)층")
+_OWNER_RE = re.compile(r"([가-힣]+) \((?:공유자|소유자)\)")
+_BIRTH_RE = re.compile(r"(\d{6})-")
+# 요약의 '1. 소유지분현황' 다음 항목이 시작되면 소유자 목록은 끝난 것입니다.
+_SUMMARY_NEXT_RE = re.compile(r"2\.\s")
+
+# 을구 / 요약의 근저당권 항목
+_ENTRY_RE = re.compile(r"^(\d+(?:-\d+)?)\s+(\S*(?:설정|말소|변경|이전|경정|등기)\S*)")
+_MAX_AMOUNT_RE = re.compile(r"채권최고액\s*금\s*([\d,]+)\s*원")
+# "근저당권자 주식회사 국민은행" 처럼 법인 표기가 이름 앞에 띄어 쓰여 있으면 그 다음 낱말까지 봅니다.
+_MORTGAGEE_RE = re.compile(r"근저당권자\s*(?:(?:주식회사|\(주\)|㈜)\s*)?(\S+)")
+_CANCELLED_RE = re.compile(r"(\d+(?:-\d+)?)번\s*\S*말소")
+_SUMMARY_LIENS_RE = re.compile(r"\(근\)저당권\s*및\s*전세권")
+_SUMMARY_ITEM_RE = re.compile(r"^\d+\.\s")
+_CORP_RE = re.compile(r"주식회사|\(주\)|㈜")
+# 같은 줄로 볼 글자 기준선(y) 차이 (pt)
+_ROW_TOLERANCE = 3.0
+
+# 구역 하나의 범위: 전체 텍스트 기준 [start, end) 와 시작/끝 페이지
+Section = namedtuple("Section", ["name", "start", "end", "first_page", "last_page"])
+# 남아 있는 근저당권: 순위번호, 근저당권자, 채권최고액(만원)
+Lien = namedtuple("Lien", ["rank", "lender", "max_amount"])
+
+# ------------------------------
+# 🔹 구역 색인
+# ------------------------------
+class RegistryText:
+    """페이지를 한 번만 훑어 만든 등기부 전체 텍스트와 구역 색인"""
+
+    def __init__(self, page_texts, links=None):
+        self.page_offsets = []
+        offset = 0
+        marks = []  # (구역 이름, 전체 오프셋, 페이지)
+        in_summary = False
+        for page_num, page_text in enumerate(page_texts):
+            self.page_offsets.append(offset)
+            # 요약은 문서 끝까지 이어지므로 그 뒤로는 머리글을 찾지 않습니다.
+            if not in_summary:
+                for m in _SECTION_RE.finditer(page_text):
+                    name = _SECTION_NAMES[m.lastgroup]
+                    marks.append((name, offset + m.start(), page_num))
+                    if name == "요약":
+                        in_summary = True
+                        break
+            offset += len(page_text)
+        self.text = "".join(page_texts)
+        self.links = links or []
+
+        self.sections = []
+        for i, (name, start, page_num) in enumerate(marks):
+            end = marks[i + 1][1] if i + 1 < len(marks) else len(self.text)
+            self.sections.append(Section(name, start, end, page_num, self.page_of(max(start, end - 1))))
+
+    @classmethod
+    def from_text(cls, text):
+        return cls([text])
+
+    @classmethod
+    def from_document(cls, doc):
+        page_texts, links = [], []
+        for page in doc:
+            page_texts.append(page.get_text("text"))
+            for link in page.get_links():
+                if "uri" in link:
+                    links.append(link["uri"])
+        return cls(page_texts, links)
+
+    def page_of(self, offset):
+        lo, hi = 0, len(self.page_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.page_offsets[mid] <= offset: lo = mid
+            else: hi = mid - 1
+        return lo
+
+    def ranges(self, name):
+        return [s for s in self.sections if s.name == name]
+
+    def pages(self, name):
+        """해당 구역이 걸쳐 있는 페이지 번호 (0부터)"""
+        result = []
+        for s in self.ranges(name):
+            result.extend(p for p in range(s.first_page, s.last_page + 1) if p not in result)
+        return result
+
+    def section_text(self, name):
+        return "".join(self.text[s.start:s.end] for s in self.ranges(name))
+
+
+def _as_registry(text):
+    return text if isinstance(text, RegistryText) else RegistryText.from_text(text)
+
+# ------------------------------
+# 🔹 텍스트 기반 추출 함수들
+# ------------------------------
+def extract_address(text):
+    """등기부 머리(첫 구역 앞)와 표제부에서 먼저 찾고, 없으면 전체 텍스트에서 찾습니다."""
+    registry = _as_registry(text)
+    head_end = registry.sections[0].start if registry.sections else len(registry.text)
+    regions = [(0, head_end)] + [(s.start, s.end) for s in registry.ranges("표제부")] + [(0, len(registry.text))]
+    for pattern in (_ADDRESS_RE, _LOCATION_RE):
+        for start, end in regions:
+            m = pattern.search(registry.text, start, end)
+            if m:
+                return m.group(1).strip()
+    return ""
+
+def _extract_area(registry):
+    # 문서 전체에서 마지막으로 나오는 ㎡ 값을 씁니다 (기존 동작 유지).
+    last = None
+    for last in _AREA_RE.finditer(registry.text):
+        pass
+    return f"{last.group(1)}㎡" if last else ""
+
+def extract_area_floor(text, address=None):
+    registry = _as_registry(text)
+    area = _extract_area(registry)
+    floor = None
+    addr = address if address is not None else extract_address(registry)
+    f_match = _FLOOR_RE.findall(addr)
+    if f_match:
+        floor = int(f_match[-1])
+    return area, floor
+
+def extract_all_names_and_births(text):
+    registry = _as_registry(text)
+    ranges = registry.ranges("요약")
+    if not ranges:
+        return []
+    summary = registry.text[ranges[0].start:ranges[0].end]
+    lines = [l.strip() for l in summary.splitlines() if l.strip()]
+    result = []
+    for i in range(len(lines)):
+        if result and _SUMMARY_NEXT_RE.match(lines[i]):
+            break
+        m = _OWNER_RE.match(lines[i])
+        if m and i + 1 < len(lines):
+            birth_match = _BIRTH_RE.match(lines[i + 1])
+            if birth_match:
+                result.append((m.group(1), birth_match.group(1)))
+    return result
+
+# ------------------------------
+# 🔹 을구 근저당권 추출 (좌표 기반)
+# ------------------------------
+def _page_rows(page):
+    """get_text("dict") 의 글자 조각을 기준선(y)으로 묶어 표의 한 줄씩 왼쪽→오른쪽 순서로 돌려줍니다.
+
+    표 칸이 여러 줄로 나뉘어 있어도 같은 높이의 칸끼리 한 줄로 모이므로, 텍스트 순서가 칸 단위로 섞이지 않습니다.
+    """
+    spans = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", ()):
+            for sp in line["spans"]:
+                if sp["text"].strip():
+                    spans.append((sp["origin"][1], sp["bbox"][0], sp["text"].strip()))
+    rows = []
+    for y, x, text in sorted(spans):
+        if rows and y - rows[-1][0] <= _ROW_TOLERANCE:
+            rows[-1][1].append((x, text))
+        else:
+            rows.append((y, [(x, text)]))
+    return [" ".join(text for _, text in sorted(cells)) for _, cells in rows]
+
+def _section_rows(doc, registry, name, start_re, stop_re):
+    """name 구역 페이지만 읽어 start_re 다음 줄부터 stop_re 앞 줄까지 돌려줍니다."""
+    rows, inside = [], False
+    for page_num in registry.pages(name):
+        for row in _page_rows(doc.load_page(page_num)):
+            if not inside:
+                inside = bool(start_re.search(row))
+            elif stop_re.search(row):
+                return rows
+            else:
+                rows.append(row)
+    return rows
+
+def _entries(rows):
+    """순위번호로 시작하는 줄마다 항목을 새로 열고, 그 뒤 줄은 같은 항목에 이어 붙입니다."""
+    entries = []
+    for row in rows:
+        m = _ENTRY_RE.match(row)
+        if m:
+            entries.append([m.group(1), m.group(2), row])
+        elif entries:
+            entries[-1][2] += " " + row
+    return entries
+
+def _lender(text):
+    m = _MORTGAGEE_RE.search(text)
+    return _CORP_RE.sub("", m.group(1)) if m else ""
+
+def _max_amount(text):
+    """채권최고액 (원 → 만원, 만원 미만 버림)"""
+    m = _MAX_AMOUNT_RE.search(text)
+    return int(m.group(1).replace(",", "")) // 10000 if m else None
+
+def _liens_from_history(entries):
+    """을구 전체 이력에서 말소되지 않은 근저당권만 남깁니다 (부기 변경/이전 반영)."""
+    liens = {}
+    for rank, purpose, text in entries:
+        main_rank = rank.split("-")[0]
+        if "말소" in purpose:
+            for cancelled in _CANCELLED_RE.findall(text):
+                liens.pop(cancelled, None)
+        elif purpose.startswith("근저당권설정") and "-" not in rank:
+            amount = _max_amount(text)
+            if amount is not None:
+                liens[rank] = Lien(rank, _lender(text), amount)
+        elif main_rank in liens and "근저당권" in purpose:
+            # 1-1 근저당권변경(채권최고액 변경), 1-2 근저당권이전(근저당권자 변경)
+            lien = liens[main_rank]
+            amount = _max_amount(text)
+            lender = _lender(text)
+            liens[main_rank] = lien._replace(max_amount=amount if amount is not None else lien.max_amount,
+                                             lender=lender or lien.lender)
+    return list(liens.values())
+
+def extract_liens(doc, registry):
+    """남아 있는 근저당권 목록. 요약의 '(근)저당권 및 전세권 등'이 있으면 그것을, 없으면 을구 이력을 씁니다.
+
+    요약은 이미 말소된 항목을 빼고 보여주고, 을구 이력은 말소 등기를 찾아 빼 줍니다. 둘 다 부기 변경/이전은 반영합니다.
+    좌표가 필요한 get_text("dict") 는 을구/요약 페이지에만 씁니다.
+    """
+    if registry.ranges("요약"):
+        rows = _section_rows(doc, registry, "요약", _SUMMARY_LIENS_RE, _SUMMARY_ITEM_RE)
+        if rows:
+            # 요약에는 말소 항목이 없지만 부기 변경/이전 항목은 있으므로 이력과 같은 방식으로 반영합니다.
+            return _liens_from_history(_entries(rows))
+    if registry.ranges("을구"):
+        stop = re.compile(SECTION_PATTERNS["요약"])
+        return _liens_from_history(_entries(_section_rows(doc, registry, "을구", re.compile(SECTION_PATTERNS["을구"]), stop)))
+    return []
+
+# ------------------------------
+# 🔹 PDF 처리 함수
+# ------------------------------
+@contextmanager
+def _document(uploaded_file):
+    """업로드 파일/바이트면 열었다가 닫고, 이미 열린 fitz 문서면 그대로 씁니다."""
+    if isinstance(uploaded_file, fitz.Document):
+        yield uploaded_file
+        return
+    data = uploaded_file if isinstance(uploaded_file, (bytes, bytearray)) else uploaded_file.read()
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        yield doc
+
+def read_registry(uploaded_file):
+    """업로드 파일(또는 바이트, 이미 열린 fitz 문서)의 페이지를 한 번만 훑고 구역 색인을 만듭니다."""
+    with _document(uploaded_file) as doc, span("pymupdf.get_text"):
+        return RegistryText.from_document(doc)
+
+def process_pdf(uploaded_file):
+    """반환: (전체 텍스트, 링크, 주소, 전용면적, 층, 공동소유자, 남아 있는 근저당권 [Lien, ...])"""
+    with span("process_pdf"), _document(uploaded_file) as doc:
+        registry = read_registry(doc)
+        with span("registry.parse"):
+            address = extract_address(registry)
+            area, floor = extract_area_floor(registry, address)
+            co_owners = extract_all_names_and_births(registry)
+        with span("registry.liens"):
+            liens = extract_liens(doc, registry)
+
+    return registry.text, registry.links, address, area, floor, co_owners, liens
@@ -0,0 +1,33 @@
+import weakref
+from collections import deque
+
+# ─────────────────────────────
+# 🎫 세션 임대 토큰
+# ─────────────────────────────
+# 세션 상태에 토큰을 넣어 두고, 세션 상태가 사라지면(세션 종료/초기화) 그 세션이 쓰던 자원을 정리합니다.
+# disk_store 와 pdf_documents 가 함께 씁니다.
+
+class SessionLeases:
+    """세션별 임대 토큰과, 토큰이 사라진(끝난) 세션 목록"""
+
+    def __init__(self):
+        self._ended = deque()
+
+    def lease(self, owner):
+        """세션 상태에 넣어 둘 토큰. 토큰이 가비지 수거되면 owner 를 끝난 세션으로 기록합니다."""
+        token = _Lease(owner)
+        # 가비지 수거는 잠금을 쥔 도중에도 일어날 수 있으므로 여기서는 기록만 하고 정리는 release_ended() 에서 합니다.
+        weakref.finalize(token, self._ended.append, owner)
+        return token
+
+    def release_ended(self, release):
+        """끝난 세션마다 release(owner) 를 호출합니다 (잠금 밖에서 불러야 합니다)."""
+        while self._ended:
+            release(self._ended.popleft())
+
+
+class _Lease:
+    __slots__ = ("owner", "__weakref__")
+
+    def __init__(self, owner):
+        self.owner = owner
@@ -0,0 +1,26 @@
+import os
+
+import batch_ingest
+
+
+def _crash(path):
+    os._exit(1)
+
+
+def test_worker_crash_is_recorded_and_batch_continues(tmp_path, monkeypatch, capsys):
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+    # 워커 프로세스가 fork 로 뜨므로 바꿔 둔 extract_one 이 워커에서도 쓰입니다.
+    monkeypatch.setattr(batch_ingest, "extract_one", _crash)
+    out = tmp_path / "result.csv"
+
+    assert batch_ingest.main([str(tmp_path), "-o", str(out), "--workers", "1"]) == 1
+
+    lines = out.read_text(encoding="utf-8-sig").splitlines()
+    assert lines[0].split(",") == batch_ingest.FIELDS
+    assert len(lines) == 3
+    assert all("BrokenProcessPool" in line for line in lines[1:])
+
+
+def test_empty_row_has_every_field():
+    assert list(batch_ingest.empty_row("x.pdf")) == batch_ingest.FIELDS
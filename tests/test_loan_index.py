@@ -0,0 +1,33 @@
+from loan_index import LoanIndex
+
+
+def loan(page_id, customer, edited):
+    return {"id": page_id, "last_edited_time": edited,
+            "properties": {"고객": {"relation": [{"id": customer}]}}}
+
+
+def test_save_responses_do_not_move_the_watermark():
+    queries = []
+
+    def loader(watermark):
+        queries.append(watermark)
+        return [loan("l1", "c1", "2026-01-01T00:00:00.000Z")] if watermark is None else []
+
+    index = LoanIndex(loader, "고객", ttl=3600, full_resync=3600)
+    index.refresh()
+    index.apply([loan("l2", "c1", "2026-01-05T00:00:00.000Z")])
+    assert [page["id"] for page in index.get("c1")] == ["l1", "l2"]
+
+    # 다음 증분 조회는 저장 응답이 아니라 마지막 조회 결과의 시점부터 받습니다.
+    index.refresh()
+    assert queries == [None, "2026-01-01T00:00:00.000Z"]
+
+
+def test_replace_drops_loans_removed_elsewhere():
+    index = LoanIndex(lambda watermark: [loan("l1", "c1", "2026-01-01T00:00:00.000Z"),
+                                         loan("l2", "c1", "2026-01-01T00:00:00.000Z")],
+                      "고객", ttl=3600, full_resync=3600)
+    index.refresh()
+    # 다른 세션이 l2 를 보관하고 l3 을 만든 뒤 다시 조회한 결과
+    index.replace("c1", [loan("l1", "c1", "2026-01-01T00:00:00.000Z"), loan("l3", "c1", "2026-01-02T00:00:00.000Z")])
+    assert [page["id"] for page in index.get("c1")] == ["l1", "l3"]
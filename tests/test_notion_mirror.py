@@ -0,0 +1,19 @@
+from notion_mirror import CustomerMirror
+
+
+def make_mirror(tmp_path):
+    mirror = CustomerMirror("db")
+    mirror.filename = str(tmp_path / "mirror.sqlite3")
+    return mirror
+
+
+def test_write_responses_do_not_move_the_watermark(tmp_path):
+    mirror = make_mirror(tmp_path)
+    mirror.apply([("p1", "김철수", {}, "2026-01-01T00:00:00.000Z")], full=True)
+    # 저장 응답은 바로 보이게 반영하지만, 그 사이 다른 곳에서 수정된 페이지를 놓치지 않도록 워터마크는 그대로 둡니다.
+    mirror.apply([("p2", "이영희", {}, "2026-01-02T00:00:00.000Z")])
+    assert mirror.watermark == "2026-01-01T00:00:00.000Z"
+    assert set(mirror.load_all()) == {"김철수", "이영희"}
+
+    mirror.apply([("p3", "박민수", {}, "2026-01-03T00:00:00.000Z")], from_query=True)
+    assert mirror.watermark == "2026-01-03T00:00:00.000Z"
@@ -0,0 +1,70 @@
+import notion_outbox
+from notion_outbox import NotionOutbox, PENDING, FAILED, DONE
+
+
+def make_outbox(tmp_path, calls, failing):
+    def handler(kind):
+        def run(payload, checkpoint):
+            calls.append((kind, payload["n"]))
+            if payload["n"] in failing:
+                raise RuntimeError("boom")
+        return run
+    return NotionOutbox({"save": handler("save"), "delete": handler("delete")}, db_file=str(tmp_path / "outbox.sqlite3"))
+
+
+def drain(outbox):
+    while outbox.run_once()[0]:
+        pass
+
+
+def statuses(outbox, customer):
+    with outbox._connect() as conn:
+        return conn.execute("SELECT kind, status FROM outbox WHERE customer = ? ORDER BY id", (customer,)).fetchall()
+
+
+def test_failed_job_holds_back_later_jobs_for_same_customer(tmp_path, monkeypatch):
+    monkeypatch.setattr(notion_outbox, "MAX_ATTEMPTS", 1)
+    calls, failing = [], {1}
+    outbox = make_outbox(tmp_path, calls, failing)
+    outbox.enqueue("save", "kim", {"n": 1})
+    outbox.enqueue("delete", "kim", {"n": 2}, coalesce=False)
+    outbox.enqueue("save", "lee", {"n": 3})
+    drain(outbox)
+
+    # kim 의 삭제는 실패한 저장 뒤에서 기다리고, 다른 고객은 막히지 않습니다.
+    assert calls == [("save", 1), ("save", 3)]
+    assert statuses(outbox, "kim") == [("save", FAILED), ("delete", PENDING)]
+    assert outbox.run_once() == (False, None)
+
+    failing.clear()
+    outbox.retry("kim")
+    drain(outbox)
+    assert calls[2:] == [("save", 1), ("delete", 2)]
+    assert statuses(outbox, "kim") == [("save", DONE), ("delete", DONE)]
+
+
+def test_new_save_merges_into_failed_save_instead_of_jumping_ahead(tmp_path, monkeypatch):
+    monkeypatch.setattr(notion_outbox, "MAX_ATTEMPTS", 1)
+    calls, failing = [], {1}
+    outbox = make_outbox(tmp_path, calls, failing)
+    outbox.enqueue("save", "kim", {"n": 1})
+    drain(outbox)
+    failing.clear()
+
+    outbox.enqueue("save", "kim", {"n": 4})
+    drain(outbox)
+    assert calls == [("save", 1), ("save", 4)]
+    assert statuses(outbox, "kim") == [("save", DONE)]
+
+
+def test_save_queues_behind_failed_job_of_other_kind(tmp_path, monkeypatch):
+    monkeypatch.setattr(notion_outbox, "MAX_ATTEMPTS", 1)
+    calls, failing = [], {1}
+    outbox = make_outbox(tmp_path, calls, failing)
+    outbox.enqueue("delete", "kim", {"n": 1}, coalesce=False)
+    drain(outbox)
+    outbox.enqueue("save", "kim", {"n": 2})
+    drain(outbox)
+
+    assert calls == [("delete", 1)]
+    assert statuses(outbox, "kim") == [("delete", FAILED), ("save", PENDING)]
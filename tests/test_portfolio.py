@@ -0,0 +1,19 @@
+from bench_ltv_engine import check_same_results, scalar_results, synthetic_portfolio, vector_results
+
+
+def test_portfolio_matches_evaluate_case():
+    customers, loans, cases = synthetic_portfolio(2000, seed=3)
+    assert vector_results(customers, loans) == scalar_results(cases)
+
+
+def test_benchmark_refuses_to_time_different_results():
+    customers, loans, cases = synthetic_portfolio(50, seed=1)
+    check_same_results(customers, loans, cases)
+    price_text, deduction, items = cases[0]
+    cases[0] = (price_text, deduction + 1000, items)
+    try:
+        check_same_results(customers, loans, cases)
+    except AssertionError as e:
+        assert "불일치 " in str(e)
+    else:
+        raise AssertionError("결과가 다른데 통과했습니다")
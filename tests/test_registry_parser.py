@@ -0,0 +1,79 @@
+import fitz
+
+from registry_parser import Lien, RegistryText, extract_liens
+
+# 을구 표 칸의 x 좌표: 순위번호 | 등기목적 | 접수 | 등기원인 | 권리자 및 기타사항
+COLUMNS = [30, 60, 160, 230, 300]
+
+
+def make_registry(rows, heading="【 을 구 】 ( 소유권 이외의 권리에 관한 사항 )", title="[집합건물] 서울특별시 강남구 역삼동 1 제3층 제301호"):
+    """rows: [(y, [칸, ...]), ...] 를 표처럼 배치한 한 쪽짜리 등기부"""
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    put = lambda x, y, text: page.insert_text((x, y), text, fontname="korea", fontsize=8)
+    put(30, 40, title)
+    put(30, 60, "【 갑 구 】 ( 소유권에 관한 사항 )")
+    put(30, 80, "1 소유권보존 2004년3월2일 소유자 이영희 700101-*******")
+    put(30, 100, heading)
+    for y, cells in rows:
+        for x, text in zip(COLUMNS, cells):
+            if text:
+                put(x, y, text)
+    # 저장했다 다시 열어 실제 업로드와 같은 경로로 읽습니다.
+    return fitz.open(stream=doc.tobytes(), filetype="pdf")
+
+
+def liens_of(doc):
+    return extract_liens(doc, RegistryText.from_document(doc))
+
+
+def test_history_applies_change_and_cancellation():
+    doc = make_registry([
+        (120, ["1", "근저당권설정", "2010년1월5일", "설정계약", "채권최고액 금24,000,000원"]),
+        (132, ["", "", "제100호", "", "근저당권자 주식회사신한은행"]),
+        (148, ["1-1", "1번근저당권변경", "2012년2월1일", "변경계약", "채권최고액 금300,000,000원"]),
+        (164, ["2", "근저당권설정", "2015년6월1일", "설정계약", "채권최고액 금39,000,000원"]),
+        (176, ["", "", "제300호", "", "근저당권자 새마을금고"]),
+        (192, ["3", "전세권설정", "2016년1월1일", "", "전세금 금100,000,000원 전세권자 박민수"]),
+        (208, ["4", "근저당권설정", "2017년1월1일", "설정계약", "채권최고액 금52,000,000원"]),
+        (220, ["", "", "제400호", "", "근저당권자 ㈜케이비캐피탈"]),
+        (236, ["5", "2번근저당권설정등기말소", "2019년3월3일", "해지", ""]),
+    ])
+    # 1번은 1-1 변경으로 채권최고액이 바뀌고, 2번은 말소, 전세권은 제외
+    assert liens_of(doc) == [Lien("1", "신한은행", 30000), Lien("4", "케이비캐피탈", 5200)]
+
+
+def test_summary_list_is_read():
+    doc = make_registry([
+        (120, ["", "3. (근)저당권 및 전세권 등 ( 을구 )"]),
+        (136, ["순위번호", "등기목적", "접수정보", "주요등기사항", "대상소유자"]),
+        (152, ["1", "근저당권설정", "2010년1월5일", "채권최고액 금180,000,000원", "이영희"]),
+        (164, ["", "", "제100호", "근저당권자 주식회사신한은행", ""]),
+        (180, ["4", "근저당권설정", "2017년1월1일", "채권최고액 금52,000,000원", "이영희"]),
+        (192, ["", "", "제400호", "근저당권자 새마을금고", ""]),
+        (208, ["", "4. 기타 사항"]),
+    ], heading="주요 등기사항 요약 (참고용)")
+    assert liens_of(doc) == [Lien("1", "신한은행", 18000), Lien("4", "새마을금고", 5200)]
+
+
+def test_summary_applies_change_rows():
+    doc = make_registry([
+        (120, ["", "3. (근)저당권 및 전세권 등 ( 을구 )"]),
+        (136, ["순위번호", "등기목적", "접수정보", "주요등기사항", "대상소유자"]),
+        (152, ["1", "근저당권설정", "2010년1월5일", "채권최고액 금180,000,000원", "이영희"]),
+        (164, ["", "", "제100호", "근저당권자 신한은행", ""]),
+        (180, ["1-1", "1번근저당권변경", "2012년2월1일", "채권최고액 금240,000,000원", "이영희"]),
+        (196, ["1-2", "1번근저당권이전", "2014년3월1일", "근저당권자 하나은행", "이영희"]),
+        (212, ["", "4. 기타 사항"]),
+    ], heading="주요 등기사항 요약 (참고용)")
+    assert liens_of(doc) == [Lien("1", "하나은행", 24000)]
+
+
+def test_lender_after_spaced_corporate_prefix():
+    doc = make_registry([
+        (120, ["1", "근저당권설정", "2010년1월5일", "설정계약", "채권최고액 금24,000,000원"]),
+        (132, ["", "", "제100호", "", "근저당권자 주식회사 국민은행"]),
+        (148, ["2", "근저당권설정", "2015년6월1일", "설정계약", "채권최고액 금39,000,000원"]),
+        (160, ["", "", "제300호", "", "근저당권자 (주) 우리은행"]),
+    ])
+    assert liens_of(doc) == [Lien("1", "국민은행", 2400), Lien("2", "우리은행", 3900)]